@@ -1,9 +1,27 @@
-from src.ai.MazeEnv import MazeEnv
-from src.ai.QLearningAgent import QLearningAgent
+from config import load_config
+from src.world.generator import MazeGenerator
+from src.world.Maze import DIRECTIONS
+from src.utils.logger import setup_logging, get_logger, MetricsAggregator
+from src.ai.model_io import load_q_model, model_sha1, ModelMismatchError
+from src.ai.PolicyTable import PolicyTable
+from src.ai.PolicyStore import PolicyStore
+import argparse
+import os
 import time
 import threading
 import socket
 
+logger = get_logger("server")
+# Modello addestrato da cui viene compilata la politica
+MODEL_FILE = "maze_q_learning_model.npy"
+# Directory delle politiche compilate, una per layout del labirinto: è una
+# cache, per default fuori dal sorgente (--policy-dir per cambiarla)
+POLICY_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "alphabot", "policies"
+)
+# Riepilogo periodico dei tempi di decisione invece di una riga per messaggio
+decision_metrics = MetricsAggregator(logger, every=100, prefix="Decisioni")
+
 # Variabili globali per le posizioni dei giocatori
 PLAYER1_CURRENT_ROOM = None
 PLAYER2_CURRENT_ROOM = None
@@ -14,23 +32,23 @@ client_data_lock = threading.Lock()
 client_ready = [False, False]
 client_connections = [None, None]
 
-def handle_client(conn, client_address, env, agent, player_id):
+def handle_client(conn, client_address, maze, policy, player_id):
     global PLAYER1_CURRENT_ROOM, PLAYER2_CURRENT_ROOM, client_ready, client_connections
     
-    print(f"Connesso al client {client_address} come Player {player_id}")
+    logger.info("Connesso al client %s come Player %d", client_address, player_id)
     BUFFER_SIZE = 4096
     
     # Salva la connessione per invio futuro
     client_connections[player_id] = conn
     
     # Invia le dimensioni del labirinto al client
-    conn.send(f"{env.game.NUM_ROWS},{env.game.NUM_COLS}".encode("utf-8"))
+    conn.send(f"{maze.num_rows},{maze.num_cols}".encode("utf-8"))
     
     try:
         while True:
             # Ricevi la stanza corrente dal client
             robot_current_room = conn.recv(BUFFER_SIZE).decode("utf-8")
-            print(f"Client {player_id} - Robot current room: {robot_current_room}")
+            logger.debug("Client %d - Robot current room: %s", player_id, robot_current_room)
             
             if not robot_current_room:
                 break
@@ -44,10 +62,10 @@ def handle_client(conn, client_address, env, agent, player_id):
                     else:
                         PLAYER2_CURRENT_ROOM = robot_current_room
                     client_ready[player_id] = True
-                    print(f"PLAYER1_CURRENT_ROOM: {PLAYER1_CURRENT_ROOM}, PLAYER2_CURRENT_ROOM: {PLAYER2_CURRENT_ROOM}")
+                    logger.debug("PLAYER1_CURRENT_ROOM: %s, PLAYER2_CURRENT_ROOM: %s", PLAYER1_CURRENT_ROOM, PLAYER2_CURRENT_ROOM)
                 
                 # Attendi che entrambi i client abbiano inviato le loro posizioni
-                print(f"Player {player_id} in attesa dell'altro giocatore...")
+                logger.debug("Player %d in attesa dell'altro giocatore...", player_id)
                 
                 # Usando barrier per sincronizzare i due thread
                 client_barrier.wait()
@@ -58,14 +76,15 @@ def handle_client(conn, client_address, env, agent, player_id):
                         # Verifica che entrambi i client siano pronti
                         if all(client_ready):
                             # Calcola le direzioni per entrambi i client
-                            direction1 = get_direction(agent=agent, state=(PLAYER1_CURRENT_ROOM, PLAYER2_CURRENT_ROOM))
-                            direction2 = get_direction(agent=agent, state=(PLAYER2_CURRENT_ROOM, PLAYER1_CURRENT_ROOM))
+                            decision_start = time.perf_counter()
+                            direction1, direction2 = get_directions(policy, PLAYER1_CURRENT_ROOM, PLAYER2_CURRENT_ROOM)
                             
                             # Invia le direzioni a entrambi i client
                             client_connections[0].send(direction1.encode("utf-8"))
                             client_connections[1].send(direction2.encode("utf-8"))
                             
-                            print(f"Inviate direzioni: Player 0 -> {direction1}, Player 1 -> {direction2}")
+                            decision_metrics.record(decision_ms=(time.perf_counter() - decision_start) * 1000)
+                            logger.debug("Inviate direzioni: Player 0 -> %s, Player 1 -> %s", direction1, direction2)
                             
                             # Resetta i flag di prontezza
                             client_ready = [False, False]
@@ -73,51 +92,71 @@ def handle_client(conn, client_address, env, agent, player_id):
                 # Attendi conferma che il client ha completato i movimenti
                 completion_status = conn.recv(BUFFER_SIZE).decode("utf-8")
                 if completion_status == "DONE":
-                    print(f"Client {player_id} ha completato i movimenti")
+                    logger.debug("Client %d ha completato i movimenti", player_id)
                 else:
-                    print(f"Messaggio inatteso dal client {player_id}: {completion_status}")
+                    logger.warning("Messaggio inatteso dal client %d: %s", player_id, completion_status)
                     
             except ValueError:
-                print(f"Errore nel formato della stanza ricevuta da client {player_id}: {robot_current_room}")
+                logger.warning("Errore nel formato della stanza ricevuta da client %d: %s", player_id, robot_current_room)
     except Exception as e:
-        print(f"Errore con client {player_id}: {e}")
+        logger.error("Errore con client %d: %s", player_id, e)
     finally:
         conn.close()
-        print(f"Connessione con client {player_id} chiusa")
+        logger.info("Connessione con client %d chiusa", player_id)
         # Segna che questo client non è più disponibile
         with client_data_lock:
             client_connections[player_id] = None
             client_ready[player_id] = False
 
-def get_direction(agent, state = (0, 23)):
+def get_direction(policy, state = (0, 23)):
     # Lo state è la tupla del player e del target
-    action = agent.get_action(state=state)
-    print(f"action: {action}")
-    action_map = {
-        0: "UP",
-        1: "DOWN",
-        2: "LEFT",
-        3: "RIGHT",
-        4: "STOP"
-    }
-    direction = action_map[action]
-    return direction
+    return policy.direction(*state)
+
+def get_directions(policy, player1_room, player2_room):
+    # Una sola lettura della tabella per entrambi i robot, ognuno insegue l'altro
+    actions = policy.batch_actions([player1_room, player2_room], [player2_room, player1_room])
+    logger.debug("actions: %s", actions)
+    return DIRECTIONS[actions[0]], DIRECTIONS[actions[1]]
 
-def main():
-    env = MazeEnv()
-    agent = QLearningAgent(env)
-    # Carica il modello addestrato
-    agent.load_model('maze_q_learning_model.pkl')
-    print(agent.q_table[0, 23])
+def main(host='0.0.0.0', port=6969, policy_dir=POLICY_DIR):
+    config = load_config()
+    setup_logging(config)
+    # Il server non usa né l'ambiente né la grafica: basta il labirinto,
+    # così l'avvio non importa gymnasium e pygame
+    num_rows, num_cols = config['maze']['min_rows'], config['maze']['min_cols']
+    maze = MazeGenerator(num_rows, num_cols).generate_maze()
+    # Le politiche sono indicizzate per hash del labirinto e registrano lo
+    # SHA-1 del modello da cui sono state compilate: se questo labirinto ne
+    # ha già una per il modello attuale viene mappata in memoria, altrimenti
+    # (nessuna politica o modello riaddestrato) viene ricompilata
+    store = PolicyStore(policy_dir)
+    try:
+        source = {'model_sha1': model_sha1(MODEL_FILE)}
+        policy = store.get(maze, source=source)
+        if policy is None:
+            # Carica il modello addestrato, rifiutandolo se è stato addestrato
+            # su un labirinto diverso
+            q_table, header = load_q_model(MODEL_FILE, maze=maze)
+            if header['action_count'] != len(DIRECTIONS):
+                raise ModelMismatchError(f"Il modello ha {header['action_count']} azioni invece di {len(DIRECTIONS)}")
+            # Compila la politica greedy (mai contro un muro) in una tabella uint8:
+            # ogni decisione è una lettura, indipendente dal dtype della Q-table
+            policy = store.put(maze, PolicyTable.from_q_table(q_table, maze), source=source)
+    except FileNotFoundError as e:
+        logger.error("Modello non trovato: %s", e)
+        return
+    except ModelMismatchError as e:
+        logger.error("Modello non valido per questo labirinto: %s", e)
+        return
+    logger.info("Politica per il labirinto %s", maze.layout_hash()[:12])
+    logger.debug("policy[0, 23]: %s", policy.direction(0, 23))
     
-    host = '0.0.0.0'
-    port = 6969
     server_address = (host, port)
     
     tcp_server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     tcp_server_socket.bind(server_address)
     tcp_server_socket.listen(5)  # Aumenta il backlog per gestire più client
-    print(f"Server in ascolto su {server_address}")
+    logger.info("Server in ascolto su %s", server_address)
     
     player_count = 0
     client_threads = []
@@ -130,23 +169,23 @@ def main():
             # Crea un nuovo thread per gestire il client
             client_thread = threading.Thread(
                 target=handle_client,
-                args=(conn, client_address, env, agent, player_count)
+                args=(conn, client_address, maze, policy, player_count)
             )
             client_thread.daemon = True
             client_thread.start()
             
             client_threads.append(client_thread)
             player_count += 1
-            print(f"Connesso client {player_count}/2")
+            logger.info("Connesso client %d/2", player_count)
         
-        print("Entrambi i client connessi. Il gioco può iniziare.")
+        logger.info("Entrambi i client connessi. Il gioco può iniziare.")
         
         # Mantieni il server in esecuzione
         while any(thread.is_alive() for thread in client_threads):
             time.sleep(1)
             
     except KeyboardInterrupt:
-        print("Chiusura server")
+        logger.info("Chiusura server")
     finally:
         # Chiudi il socket del server
         tcp_server_socket.close()
@@ -157,4 +196,9 @@ def main():
                 thread.join(timeout=1.0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Server di gioco per gli AlphaBot")
+    parser.add_argument("--host", default='0.0.0.0')
+    parser.add_argument("--port", type=int, default=6969)
+    parser.add_argument("--policy-dir", default=POLICY_DIR, help="Directory delle politiche compilate")
+    args = parser.parse_args()
+    main(host=args.host, port=args.port, policy_dir=args.policy_dir)
\ No newline at end of file
@@ -0,0 +1,78 @@
+import numpy as np
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0, out=x),
+    'tanh': lambda x: np.tanh(x, out=x),
+    'sigmoid': lambda x: np.divide(1, 1 + np.exp(-x, out=x), out=x),
+}
+
+class NumpyMLP:
+    """
+    Inference-only copy of a stack of Dense layers evaluated with plain
+    matmuls. Works for one state or a batch and never imports Keras, so it
+    can be used on the server and the robots; it is built from a Keras model
+    with from_keras or from a file written by save.
+    """
+    def __init__(self, weights, biases, activations):
+        """
+        Parameters:
+        - weights: List of in x out kernel matrices, one per layer
+        - biases: List of bias vectors, one per layer
+        - activations: List of activation names (see ACTIVATIONS), one per layer
+        """
+        for activation in activations:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+
+    @classmethod
+    def from_keras(cls, model):
+        """Copy the weights of the Dense layers of a Keras model."""
+        network = cls([], [], [])
+        network.load_keras_weights(model)
+        return network
+
+    def load_keras_weights(self, model):
+        """Refresh the weights from the Keras model, e.g. after a training step."""
+        layers = [layer for layer in model.layers if layer.get_weights()]
+        self.weights, self.biases, self.activations = [], [], []
+        for layer in layers:
+            kernel, bias = layer.get_weights()
+            self.weights.append(kernel.astype(np.float32))
+            self.biases.append(bias.astype(np.float32))
+            self.activations.append(layer.get_config().get('activation', 'linear'))
+
+    def predict(self, states):
+        """
+        Parameters:
+        - states: One state vector or a batch of them
+
+        Returns:
+        - Batch x outputs array (1 x outputs for a single state)
+        """
+        x = np.asarray(states, dtype=np.float32).reshape(-1, self.weights[0].shape[0])
+        for weight, bias, activation in zip(self.weights, self.biases, self.activations):
+            x = x @ weight
+            x += bias
+            x = ACTIVATIONS[activation](x)
+        return x
+
+    def save(self, filename):
+        arrays = {}
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            arrays[f'weight_{i}'] = weight
+            arrays[f'bias_{i}'] = bias
+        np.savez(filename, activations=np.array(self.activations), **arrays)
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as data:
+            num_layers = len(data['activations'])
+            return cls(
+                [data[f'weight_{i}'] for i in range(num_layers)],
+                [data[f'bias_{i}'] for i in range(num_layers)],
+                [str(activation) for activation in data['activations']]
+            )
@@ -0,0 +1,93 @@
+import os
+from collections import OrderedDict
+from src.ai.PolicyTable import PolicyTable
+from src.ai.model_io import model_paths, load_header, POLICY_FORMAT
+from src.ai.planner import solve_q_table
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class PolicyStore:
+    """
+    Policies indexed by the layout hash of the maze they were compiled for.
+    Each layout is saved as <hash>.npy/.json in the store directory; the
+    most recently used ones stay in an in-memory LRU, the others are
+    memory-mapped from disk on their first lookup, so switching maze only
+    costs a dictionary lookup or a file mapping. A policy can record the
+    source it was compiled from (e.g. the SHA-1 of a model file): lookups
+    for another source treat it as stale, so a retrained model is never
+    shadowed by the policy of the previous one.
+    """
+    def __init__(self, directory, capacity=8):
+        """
+        Parameters:
+        - directory: Directory holding the saved policies (created if missing)
+        - capacity: Number of policies kept in the in-memory LRU
+        """
+        self.directory = directory
+        self.capacity = max(1, capacity)
+        self._cache = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, layout_hash):
+        return os.path.join(self.directory, f"{layout_hash}.npy")
+
+    def _remember(self, layout_hash, policy, source):
+        self._cache[layout_hash] = (policy, source)
+        self._cache.move_to_end(layout_hash)
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+    def __contains__(self, maze):
+        layout_hash = maze.layout_hash()
+        return layout_hash in self._cache or os.path.exists(model_paths(self._path(layout_hash))[1])
+
+    def layouts(self):
+        """Layout hashes of all the policies saved in the store."""
+        return sorted(name[:-len(".json")] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def get(self, maze, source=None):
+        """
+        Policy of the maze, or None if the store has none for its layout.
+        With a source, a policy compiled from a different source is stale and None is returned.
+        """
+        layout_hash = maze.layout_hash()
+        if layout_hash in self._cache:
+            policy, stored_source = self._cache[layout_hash]
+        elif os.path.exists(model_paths(self._path(layout_hash))[1]):
+            stored_source = load_header(self._path(layout_hash), POLICY_FORMAT).get('source')
+            policy = None
+        else:
+            return None
+        if source is not None and stored_source != source:
+            logger.info("Stale policy for layout %s, compiled from another source", layout_hash[:12])
+            return None
+        if policy is None:
+            policy = PolicyTable.load(self._path(layout_hash), maze=maze, mmap_mode='r')
+        self._remember(layout_hash, policy, stored_source)
+        return policy
+
+    def put(self, maze, policy, persist=True, source=None):
+        """
+        Add the policy of the maze, saving it in the store directory unless persist is False.
+
+        Parameters:
+        - source: JSON-serializable identity of what the policy was compiled from
+        """
+        layout_hash = maze.layout_hash()
+        if persist:
+            policy.save(self._path(layout_hash), maze, source=source)
+        self._remember(layout_hash, policy, source)
+        return policy
+
+    def get_or_solve(self, maze, discount_factor=0.99):
+        """
+        Policy of the maze, solved by value iteration and stored when the
+        layout has none yet.
+        """
+        policy = self.get(maze)
+        if policy is None:
+            q_table, iterations = solve_q_table(maze, discount_factor=discount_factor)
+            policy = self.put(maze, PolicyTable.from_q_table(q_table, maze))
+            logger.info("Solved policy for layout %s in %d iterations", maze.layout_hash()[:12], iterations)
+        return policy
@@ -5,6 +5,12 @@ from src.ai.MazeEnv import MazeEnv
 import os
 import pickle
 import time
+from src.utils.logger import get_logger
+from src.ai.model_io import save_q_model, load_q_model, model_paths, ModelMismatchError
+from src.ai.PolicyTable import PolicyTable
+from src.world.Maze import Maze
+
+logger = get_logger(__name__)
 
 class QLearningAgent:
     def __init__(self, env, learning_rate=0.1, discount_factor=0.99, 
@@ -37,6 +43,9 @@ class QLearningAgent:
         # Initialize Q-table
         self.q_table = np.zeros(state_size + (action_size,))
         
+        # Greedy policy compiled by export_policy, used by get_action when present
+        self.policy = None
+        
         # Training history
         self.training_history = {
             'episode_rewards': [],
@@ -53,9 +62,32 @@ class QLearningAgent:
         return (player_room, target_room)
     
     def get_action(self, state):
-        print(self.q_table[state])
+        if self.policy is not None:
+            return self.policy.action(*state)
+        logger.debug("q_table%s: %s", state, self.q_table[state])
         return np.argmax(self.q_table[state])
 
+    def _env_maze(self):
+        """Maze of the environment's game graph, the layout the agent trains on."""
+        return Maze.from_graph(self.env.game.graph, self.env.game.NUM_ROWS, self.env.game.NUM_COLS)
+
+    def export_policy(self, maze=None, filename=None):
+        """
+        Compile the Q-table into a greedy uint8 policy table, used by
+        get_action from now on
+        
+        Parameters:
+        - maze: Maze whose walls are never chosen (defaults to the environment's)
+        - filename: If given, also save the policy there
+        """
+        if maze is None:
+            maze = self._env_maze()
+        self.policy = PolicyTable.from_q_table(self.q_table, maze)
+        if filename is not None:
+            array_path, _ = self.policy.save(filename, maze)
+            logger.info("Policy exported to %s", array_path)
+        return self.policy
+
     def train(self, num_episodes=200, max_steps_per_episode=200):
         """
         Train the Q-Learning agent
@@ -80,13 +112,9 @@ class QLearningAgent:
                     action = self.env.action_space.sample()  # Exploration
                 else:
                     action = np.argmax(self.q_table[state])  # Exploitation
-                print(f"\n\n\n\n\n[DEBUG]action: {action}")
-                print(f"[DEBUG]state: {state}")
                 # Execute action
                 next_state, reward, done, truncated, info = self.env.step(action)
-                print(f"[DEBUG]pre discretize: {next_state}")
                 next_state = self.discretize_state(next_state)
-                print(f"[DEBUG]next_state: {next_state}\n\n\n\n")
                 # Q-table update
                 old_value = self.q_table[state + (action,)]
                 next_max = np.max(self.q_table[next_state])
@@ -167,32 +195,53 @@ class QLearningAgent:
         
         return test_rewards
 
-    def save_model(self, filename='q_learning_model.pkl'):
+    def save_model(self, filename='q_learning_model.npy', maze=None):
         """
-        Save the trained Q-table to a file
+        Save the trained Q-table as a raw .npy array plus a .json header
+        with the maze dimensions, layout hash, dtype and action count
         
         Parameters:
         - filename: Path to save the model
+        - maze: Maze the model was trained on (defaults to the environment's)
         """
-        with open(filename, 'wb') as f:
-            pickle.dump({
-                'q_table': self.q_table,
-                'training_history': self.training_history
-            }, f)
-        print(f"Model saved to {filename}")
+        if maze is None:
+            maze = self._env_maze()
+        array_path, _ = save_q_model(
+            filename, self.q_table, maze,
+            episodes=len(self.training_history.get('episode_rewards', [])),
+            average_rewards=[float(r) for r in self.training_history.get('average_rewards', [])]
+        )
+        logger.info("Model saved to %s", array_path)
 
-    def load_model(self, filename='q_learning_model.pkl'):
+    def load_model(self, filename='q_learning_model.npy', maze=None, mmap=False):
         """
-        Load a previously saved Q-table
+        Load a previously saved Q-table. With a maze, raises ModelMismatchError
+        if the model was trained on a different maze. Legacy pickled models
+        (.pkl) are still read, without any layout check.
         
         Parameters:
         - filename: Path to load the model from
+        - maze: Maze the model must have been trained on
+        - mmap: Memory-map the Q-table read-only instead of reading it
         """
-        if os.path.exists(filename):
+        _, header_path = model_paths(filename)
+        if filename.endswith('.pkl') and os.path.exists(filename):
             with open(filename, 'rb') as f:
                 data = pickle.load(f)
                 self.q_table = data['q_table']
                 self.training_history = data.get('training_history', {})
-            print(f"Model loaded from {filename}")
+            logger.warning("Loaded legacy pickled model %s, re-save it to get the layout check", filename)
+        elif os.path.exists(header_path):
+            q_table, header = load_q_model(filename, maze=maze, mmap_mode='r' if mmap else None)
+            if header['action_count'] != self.q_table.shape[-1]:
+                raise ModelMismatchError(
+                    f"Model has {header['action_count']} actions, the environment has {self.q_table.shape[-1]}"
+                )
+            self.q_table = q_table
+            self.training_history = {
+                'episode_rewards': [],
+                'average_rewards': header.get('average_rewards', [])
+            }
+            logger.info("Model loaded from %s", filename)
         else:
-            print(f"No model found at {filename}")
\ No newline at end of file
+            logger.warning("No model found at %s", filename)
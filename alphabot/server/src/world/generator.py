@@ -1,6 +1,7 @@
 from typing import List, Dict, Set
 import random
-import networkx as nx
+import numpy as np
+from src.world.Maze import Maze, WALL_UP, WALL_DOWN, WALL_LEFT, WALL_RIGHT
 
 class MazeGenerator:
     def __init__(self, num_rows: int, num_cols: int):
@@ -36,93 +37,110 @@ class MazeGenerator:
         return graph
     
 
-    def generate_grid_graph(self, rows=4, cols=6):
-        """
-        Generate a 4x6 grid graph with static edge removals based on an internal configuration.
-        
-        Returns:
-            nx.Graph: A 4x6 grid graph with predetermined edges removed
+    # Predefined removal configuration tailored for a 4x6 grid
+    # Format: {node_id: [neighbor_ids_to_disconnect]}
+    REMOVAL_CONFIG = {
+        0: [1],         # Top row, first node
+        2: [8],         # Top row, third node
+        5: [11],        # Top row, last node
+        6: [7, 12],     # Second row, first node
+        9: [10, 15],    # Second row, fourth node
+        13: [14],       # Third row, second node
+        17: [16, 23],   # Third row, last node
+        19: [13],       # Fourth row, second node
+        21: [15],       # Fourth row, fourth node
+        22: [21]        # Fourth row, fifth node
+    }
+
+    def generate_grid_walls(self, rows=4, cols=6, removal_config=None) -> np.ndarray:
         """
-        import networkx as nx
-        
-        # Create an empty graph
-        G = nx.Graph()
+        Generate a grid maze with static edge removals based on an internal configuration.
         
-        # Generate nodes in a grid structure (4 rows x 6 columns)
-        for r in range(rows):
-            for c in range(cols):
-                node_id = r * cols + c
-                G.add_node(node_id)
+        The removals are tried in configuration order and an edge is only
+        removed if the rooms stay connected. Instead of checking connectivity
+        for every candidate, the decisions are taken with a union-find: the
+        edges that are never removed are joined first, then the candidates
+        are visited in reverse order and kept only when they join two
+        components. This keeps exactly the edges the sequential check keeps
+        (reverse-delete and Kruskal select the same spanning structure for
+        the same edge order) in near-linear time.
         
-        # Dictionary to store adjacent nodes
-        adjacent_nodes = {}
+        Args:
+            rows (int): Number of rows of the grid
+            cols (int): Number of columns of the grid
+            removal_config (dict): {node_id: [neighbor_ids_to_disconnect]},
+                defaults to REMOVAL_CONFIG
         
-        # Add connections between adjacent nodes
-        for r in range(rows):
-            for c in range(cols):
-                current_node = r * cols + c
-                adjacent = []
-                
-                # Right connection
-                if c < cols - 1:
-                    right_node = current_node + 1
-                    G.add_edge(current_node, right_node)
-                    adjacent.append(right_node)
-                
-                # Left connection
-                if c > 0:
-                    left_node = current_node - 1
-                    adjacent.append(left_node)
-                
-                # Down connection
-                if r < rows - 1:
-                    down_node = current_node + cols
-                    G.add_edge(current_node, down_node)
-                    adjacent.append(down_node)
-                
-                # Up connection
-                if r > 0:
-                    up_node = current_node - cols
-                    adjacent.append(up_node)
-                
-                # Store adjacent nodes
-                adjacent_nodes[current_node] = adjacent
-        
-        # Predefined removal configuration tailored for a 4x6 grid
-        # Format: {node_id: [neighbor_ids_to_disconnect]}
-        removal_config = {
-            0: [1],         # Top row, first node
-            2: [8],         # Top row, third node
-            5: [11],        # Top row, last node
-            6: [7, 12],     # Second row, first node
-            9: [10, 15],    # Second row, fourth node
-            13: [14],       # Third row, second node
-            17: [16, 23],   # Third row, last node
-            19: [13],       # Fourth row, second node
-            21: [15],       # Fourth row, fourth node
-            22: [21]        # Fourth row, fifth node
-        }
+        Returns:
+            np.ndarray: rows * cols uint8 wall bits of each room (see Maze)
+        """
+        if removal_config is None:
+            removal_config = self.REMOVAL_CONFIG
+        num_rooms = rows * cols
         
-        # Remove edges according to the predefined configuration
+        # Candidate edges in removal order, skipping pairs that are not
+        # adjacent rooms of this grid (only the first occurrence counts)
+        candidates = []
+        seen = set()
         for node, neighbors_to_remove in removal_config.items():
             for neighbor in neighbors_to_remove:
-                # Check if node and neighbor are within the grid boundaries
-                if (node < rows * cols and neighbor < rows * cols and 
-                    node >= 0 and neighbor >= 0 and 
-                    G.has_edge(node, neighbor)):
-                    
-                    # Create a temporary graph to check connectivity
-                    G_temp = G.copy()
-                    G_temp.remove_edge(node, neighbor)
-                    
-                    # Only remove the edge if it doesn't disconnect the graph
-                    if nx.is_connected(G_temp):
-                        G.remove_edge(node, neighbor)
+                edge = (min(node, neighbor), max(node, neighbor))
+                if (0 <= edge[0] and edge[1] < num_rooms and edge not in seen
+                        and self._is_grid_edge(edge[0], edge[1], cols)):
+                    seen.add(edge)
+                    candidates.append(edge)
         
-        return G
+        # Only the outer border is closed in the full grid
+        rooms = np.arange(num_rooms)
+        walls = np.zeros(num_rooms, dtype=np.uint8)
+        walls[rooms < cols] |= WALL_UP
+        walls[rooms >= num_rooms - cols] |= WALL_DOWN
+        walls[rooms % cols == 0] |= WALL_LEFT
+        walls[rooms % cols == cols - 1] |= WALL_RIGHT
+        if not candidates:
+            return walls
+        
+        components = _DisjointSet(num_rooms)
+        # Right and down connection of every room that is never removed
+        for node in range(num_rooms):
+            if node % cols < cols - 1 and (node, node + 1) not in seen:
+                components.union(node, node + 1)
+            if node + cols < num_rooms and (node, node + cols) not in seen:
+                components.union(node, node + cols)
+        for node, neighbor in reversed(candidates):
+            # Joining two components means removing this edge would disconnect the maze
+            if components.union(node, neighbor):
+                continue
+            if neighbor - node == 1:
+                walls[node] |= WALL_RIGHT
+                walls[neighbor] |= WALL_LEFT
+            else:
+                walls[node] |= WALL_DOWN
+                walls[neighbor] |= WALL_UP
+        return walls
 
+    def generate_grid_graph(self, rows=4, cols=6, removal_config=None):
+        """
+        networkx view of generate_grid_walls, for tooling that wants a graph.
+        
+        Returns:
+            nx.Graph: A rows x cols grid graph with predetermined edges removed
+        """
+        return Maze(self.generate_grid_walls(rows, cols, removal_config), rows, cols).graph
 
+    @staticmethod
+    def _is_grid_edge(node: int, neighbor: int, cols: int) -> bool:
+        """True if node < neighbor are horizontally or vertically adjacent rooms."""
+        return neighbor - node == cols or (neighbor - node == 1 and node // cols == neighbor // cols)
 
+    def generate_maze(self) -> Maze:
+        """
+        Genera il labirinto con le sue tabelle di distanza e di percorso precalcolate.
+        Returns:
+            Maze: Muri delle stanze con le tabelle distance/next_hop
+        """
+        walls = self.generate_grid_walls(self.num_rows, self.num_cols)
+        return Maze(walls, self.num_rows, self.num_cols)
 
 
 
@@ -154,4 +172,28 @@ class MazeGenerator:
             if row < self.num_rows - 1:
                 neighbors.append(room_id + self.num_cols)
 
-            return neighbors
\ No newline at end of file
+            return neighbors
+
+class _DisjointSet:
+    """Union-find over room ids with path halving and union by size."""
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the components of a and b, False if they were already one."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return True
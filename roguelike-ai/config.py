@@ -21,7 +21,10 @@ def load_config(config_path: str = None) -> dict:
                 'min_rows': 3,
                 'max_rows': 7,
                 'min_cols': 4,
-                'max_cols': 8
+                'max_cols': 8,
+                'algorithm': 'static',
+                'loop_density': 0.0,
+                'seed': None
             },
             'colors': {
                 'white': [255, 255, 255],
@@ -33,5 +36,11 @@ def load_config(config_path: str = None) -> dict:
             'player': {
                 'speed': 5,
                 'size': 10
+            },
+            'env': {
+                'max_episode_steps': 200
+            },
+            'logging': {
+                'level': 'INFO'
             }
         }
\ No newline at end of file
@@ -1,5 +1,8 @@
+from config import load_config
 from src.core.Game import MazeGame
+from src.utils.logger import setup_logging
 
 if __name__ == "__main__":
+    setup_logging(load_config())
     game = MazeGame()
     game.run()
\ No newline at end of file
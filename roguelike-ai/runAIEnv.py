@@ -1,22 +1,38 @@
 from src.ai.MazeEnv import MazeEnv
 from src.ai.QLearningAgent import QLearningAgent
+from src.ai.VecMazeEnv import VecMazeEnv
+from src.utils.logger import setup_logging
 def main():
 
     env = MazeEnv()
+    setup_logging(env.config)
     
 
     agent = QLearningAgent(env)
-    print({k: v for k, v in env.game.graph.adjacency()})
+    print({k: v for k, v in env.sim.graph.adjacency()})
     print()
     
     # Option 1: Train and save the model
     #agent.train(num_episodes=10000)
-    #agent.save_model('maze_q_learning_model.pkl')
+    #agent.save_model('maze_q_learning_model.npy')
+
+    # Option 1b: Train with parallel rollout workers and save the model
+    #agent.train_parallel(num_episodes=10000, num_workers=8, batch_size=1024, sync_interval=4)
+    #agent.save_model('maze_q_learning_model.npy')
+    
+    # Option 1b': Train on a batch of vectorized environments and save the model
+    #vec_agent = QLearningAgent(VecMazeEnv(num_envs=64))
+    #vec_agent.train_vectorized(num_episodes=10000)
+    #vec_agent.save_model('maze_q_learning_model.npy')
+    
+    # Option 1c: Solve the Q-table from the known maze dynamics and save the model
+    #agent.solve()
+    #agent.save_model('maze_q_learning_model.npy')
     
     # Option 2: Load a pre-existing model and test
-    agent.load_model('maze_q_learning_model.pkl')
+    agent.load_model('maze_q_learning_model.npy')
     # Perform multiple test runs
-    test_rewards = agent.test(num_tests=5)
+    test_rewards = agent.test(num_tests=5, interactive=True)
     print("\nTest Rewards:", test_rewards)
     
     # Close the environment
@@ -1,23 +1,35 @@
-from keras.models import Sequential
-from keras.layers import Dense, Flatten, Input
-from keras.optimizers import Adam
-from collections import deque
+from src.ai.ReplayBuffer import ReplayBuffer
+from src.ai.PrioritizedReplayBuffer import PrioritizedReplayBuffer
+from src.ai.NumpyMLP import NumpyMLP
+from src.ai.exploration import epsilon_greedy
 import random
 import numpy as np
 
 class DQNAgent:
-    def __init__(self, state_size, action_size):
+    def __init__(self, state_size, action_size, memory_size=2000, prioritized=False):
         self.state_size = state_size
         self.action_size = action_size
-        self.memory = deque(maxlen=2000)
+        # Con prioritized le transizioni con TD error alto vengono ripetute più spesso
+        self.prioritized = prioritized
+        if prioritized:
+            self.memory = PrioritizedReplayBuffer(memory_size, state_size)
+        else:
+            self.memory = ReplayBuffer(memory_size, state_size)
         self.gamma = 0.95    # discount factor
         self.epsilon = 1.0   # exploration rate
         self.epsilon_min = 0.01
         self.epsilon_decay = 0.995
         self.learning_rate = 0.001
         self.model = self._build_model()
+        # Copia NumPy della rete per act, aggiornata dopo ogni replay
+        self.inference = NumpyMLP.from_keras(self.model)
         
     def _build_model(self):
+        # Keras viene importato solo quando serve costruire la rete
+        from keras.models import Sequential
+        from keras.layers import Dense, Input
+        from keras.optimizers import Adam
+
         # Rete neurale per approssimazione della Q-function
         model = Sequential()
         model.add(Input(shape=(self.state_size,)))
@@ -28,25 +40,43 @@ class DQNAgent:
         return model
         
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.add(state, action, reward, next_state, done)
         
     def act(self, state, explore=True):
         if explore and np.random.rand() <= self.epsilon:
             return random.randrange(self.action_size)
-        act_values = self.model.predict(state.reshape(1, -1), verbose=0)
-        return np.argmax(act_values[0])
+        act_values = self.inference.predict(state)
+        return int(np.argmax(act_values[0]))
         
+    def act_batch(self, states, epsilon=None):
+        # Un solo forward pass e una sola estrazione casuale per tutto il batch
+        epsilon = self.epsilon if epsilon is None else epsilon
+        return epsilon_greedy(self.inference.predict(states), epsilon)
+
     def replay(self, batch_size):
         if len(self.memory) < batch_size:
             return
-        minibatch = random.sample(self.memory, batch_size)
-        for state, action, reward, next_state, done in minibatch:
-            target = reward
-            if not done:
-                target = reward + self.gamma * np.amax(
-                    self.model.predict(next_state.reshape(1, -1), verbose=0)[0])
-            target_f = self.model.predict(state.reshape(1, -1), verbose=0)
-            target_f[0][action] = target
-            self.model.fit(state.reshape(1, -1), target_f, epochs=1, verbose=0)
+        weights = None
+        if self.prioritized:
+            states, actions, rewards, next_states, dones, indices, weights = self.memory.sample(batch_size)
+        else:
+            states, actions, rewards, next_states, dones = self.memory.sample(batch_size)
+
+        # Un solo forward pass per states e next_states e un solo fit per minibatch
+        next_q = self.model.predict(next_states, verbose=0)
+        targets = rewards + self.gamma * np.amax(next_q, axis=1) * ~dones
+        target_f = self.model.predict(states, verbose=0)
+        rows = np.arange(batch_size)
+        td_errors = targets - target_f[rows, actions]
+        target_f[rows, actions] = targets
+        self.model.fit(states, target_f, sample_weight=weights, batch_size=batch_size, epochs=1, verbose=0)
+        self.inference.load_keras_weights(self.model)
+        if self.prioritized:
+            self.memory.update_priorities(indices, td_errors)
         if self.epsilon > self.epsilon_min:
-            self.epsilon *= self.epsilon_decay
\ No newline at end of file
+            self.epsilon *= self.epsilon_decay
+
+    def export_inference(self, filename):
+        """Save the network weights for NumpyMLP.load, which does not need Keras."""
+        self.inference.load_keras_weights(self.model)
+        self.inference.save(filename)
@@ -1,35 +1,61 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
-import pygame as pg
-from src.core.Game import MazeGame
-import networkx as nx
+from config import load_config
+from src.core.Simulation import MazeSimulation
+from src.ai.rewards import shaped_reward, WALL_PENALTY
+from src.world.MazePool import MazePool
+from src.world.Maze import DIRECTIONS
 import random
 
 class MazeEnv(gym.Env):
     metadata = {'render.modes': ['human', 'rgb_array'], 'render_fps': 60}
 
-    def __init__(self):
+    def __init__(self, reuse_maze=True, regenerate_every=None, max_episode_steps=None, policy_store=None,
+                 maze_pool=None, seed=None):
+        """
+        Parameters:
+        - reuse_maze: Keep the generated maze across resets and only respawn the players
+        - regenerate_every: When reusing the maze, generate a new one every K episodes
+        - max_episode_steps: Steps after which the episode is truncated
+          (defaults to env.max_episode_steps in config.yaml)
+        - policy_store: PolicyStore used by policy() to find the policy of the current maze
+        - maze_pool: MazePool (or the path of a pool file) the new mazes are
+          sampled from instead of being generated
+        """
         super(MazeEnv, self).__init__()
-        
-        # Initialize the game
-        self.game = MazeGame()
-        
+        self.reuse_maze = reuse_maze
+        self.regenerate_every = regenerate_every
+        self.episode_count = 0
+        self.policy_store = policy_store
+
+        # Load the configuration once, every reset reuses it
+        self.config = load_config()
+        if max_episode_steps is None:
+            max_episode_steps = self.config['env']['max_episode_steps']
+        self.max_episode_steps = max_episode_steps
+
+        # Initialize the headless simulation
+        if isinstance(maze_pool, str):
+            maze_pool = MazePool(maze_pool)
+        self.sim = MazeSimulation(self.config, rng=self.np_random, maze_pool=maze_pool, seed=seed)
+
         # Define action space (discrete)
-        self.action_space = spaces.Discrete(4)  # 0: UP, 1: DOWN, 2: LEFT, 3: RIGHT
-        
+        self.action_space = spaces.Discrete(len(DIRECTIONS))  # 0: UP, 1: DOWN, 2: LEFT, 3: RIGHT
+
         # Define observation space
         # Now using more comprehensive state representation
         self.observation_space = spaces.Box(
-            low=0, high=self.game.NUM_ROOMS - 1, 
+            low=0, high=self.sim.NUM_ROOMS - 1,
             shape=(2,),  # Player 1 and Player 2 current rooms
             dtype=np.int32
         )
-        
+
         # Initialize the state
         self.state = self._get_state()
-        
-        # Rendering variables
+
+        # Rendering variables, the pygame MazeGame is only built by render()
+        self.renderer = None
         self.screen = None
         self.clock = None
 
@@ -39,8 +65,8 @@ class MazeEnv(gym.Env):
         Returns a numpy array representing the current rooms of both players.
         """
         return np.array([
-            self.game.player1.current_room, 
-            self.game.player2.current_room
+            self.sim.player1_room,
+            self.sim.player2_room
         ], dtype=np.int32)
 
     def reset(self, seed=None, options=None):
@@ -48,228 +74,163 @@ class MazeEnv(gym.Env):
         Reset the environment and return the initial state.
         """
         super().reset(seed=seed)
-        
-        # Reset the game
-        self.game = MazeGame()
-        
+
+        # Seeding replaces the generator, keep the simulation on the current one
+        self.sim.rng = self.np_random
+
+        # Regenerate the maze only when asked to, otherwise just respawn the players
+        regenerate_due = (
+            self.regenerate_every is not None
+            and self.episode_count > 0
+            and self.episode_count % self.regenerate_every == 0
+        )
+        if not self.reuse_maze or regenerate_due:
+            self.sim.regenerate()
+        self.sim.reset()
+        self.episode_count += 1
+
         # Get initial state
         self.state = self._get_state()
-        
+
         return self.state, {}
 
     def step(self, action):
+        # The episode clock counts steps, not wall-clock time
+        self.sim.tick()
+
         # Check if the move is unauthorized
-        if self.unauthorized_moves(action=action, player=self.game.player1):
+        if self.unauthorized_moves(action=action, room=self.sim.player1_room):
             # Apply penalty
-            reward = -5
+            reward = WALL_PENALTY
             # Don't change the state
             next_state = self._get_state()
             # Maybe set done to True or use a truncated flag
             return next_state, reward, False, True, {}
-            
+
         # If we get here, the move is authorized
         # Execute the action for player1
-        self._move_player(self.game.player1, action)
-        
-        # Move player2 using a separate strategy 
+        self._move_player(action)
+
+        # Move player2 using a separate strategy
         self._move_player2()
-        
+
         # Get the new state
         next_state = self._get_state()
-        
+
         # Calculate the reward
         reward = self._get_reward(action)
-        
+
         # Save current distance for next comparison
-        self.game.previous_distance_room = nx.shortest_path_length(
-            self.game.graph, 
-            self.game.player1.current_room, 
-            self.game.player2.current_room
+        self.sim.previous_distance_room = self.sim.maze.shortest_path_length(
+            self.sim.player1_room,
+            self.sim.player2_room
         )
-        
-        # Check if the episode is terminated
-        done = self.game.check_collision_between_player() or self.game.timer(1)
-        
-        return next_state, reward, done, False, {}
 
-    def _move_player(self, player, action):
+        # Check if the episode is terminated, or truncated by the step budget
+        done = self.sim.check_collision_between_player()
+        truncated = not done and self.sim.out_of_steps(self.max_episode_steps)
+
+        return next_state, reward, done, truncated, {}
+
+    def _move_player(self, action):
         """
-        Execute movement for a given player based on the action.
+        Execute movement for player1 based on the action.
         """
-        # Map the action to a direction
-        action_map = {
-            0: "UP",
-            1: "DOWN", 
-            2: "LEFT", 
-            3: "RIGHT"
-        }
-        direction = action_map[action]
-        
-        # Get available moves from the current room
-        available_moves = list(self.game.graph.neighbors(player.current_room))
-        
-        # Determine target room based on direction
-        target_room = None
-        if direction == "UP" and (player.current_room - self.game.NUM_COLS) in available_moves:
-            target_room = player.current_room - self.game.NUM_COLS
-        elif direction == "DOWN" and (player.current_room + self.game.NUM_COLS) in available_moves:
-            target_room = player.current_room + self.game.NUM_COLS
-        elif direction == "LEFT" and (player.current_room - 1) in available_moves:
-            target_room = player.current_room - 1
-        elif direction == "RIGHT" and (player.current_room + 1) in available_moves:
-            target_room = player.current_room + 1
-        
+        target_room = self.sim.maze.target_room(self.sim.player1_room, action)
+
         # If a valid move is found, move the player
-        if target_room is not None:
-            # Update player's room
-            player.current_room = target_room
-            
-            # Reset grid position to center of the new room
-            target_room_obj = self.game.rooms[target_room]
-            player.grid_x = (target_room_obj.grid_size) // 2
-            player.grid_y = (target_room_obj.grid_size) // 2
-            
-            # Update absolute position
-            player.pos = [
-                player.grid_x * player.tile_size + player.tile_size // 2,
-                player.grid_y * player.tile_size + player.tile_size // 2
-            ]
+        if target_room >= 0:
+            self.sim.player1_room = target_room
 
     def _move_player2(self):
         """
         Move player2 using a strategy to approach player1.
         """
-        player1 = self.game.player1
-        player2 = self.game.player2
-        
-        # Find the shortest path to player1's room
-        try:
-            path = nx.shortest_path(
-                self.game.graph, 
-                player2.current_room, 
-                player1.current_room
-            )
-            
-            # If path exists and is longer than 1 (not same room)
-            if len(path) > 1:
-                # Move to the next room in the path
-                target_room = path[1]
-                
-                # Update player's room
-                player2.current_room = target_room
-                
-                # Reset grid position to center of the new room
-                target_room_obj = self.game.rooms[target_room]
-                player2.grid_x = (target_room_obj.grid_size) // 2
-                player2.grid_y = (target_room_obj.grid_size) // 2
-                
-                # Update absolute position
-                player2.pos = [
-                    player2.grid_x * player2.tile_size + player2.tile_size // 2,
-                    player2.grid_y * player2.tile_size + player2.tile_size // 2
-                ]
-        except nx.NetworkXNoPath:
+        # Next room on the shortest path to player1's room
+        target_room = self.sim.maze.next_room(
+            self.sim.player2_room,
+            self.sim.player1_room
+        )
+
+        if target_room >= 0:
+            # Move to the next room in the path (stays put if already there)
+            self.sim.player2_room = target_room
+        else:
             # If no path exists, choose a random neighboring room
-            available_moves = list(self.game.graph.neighbors(player2.current_room))
-            if available_moves:
-                target_room = random.choice(available_moves)
-                
-                # Update player's room
-                player2.current_room = target_room
-                
-                # Reset grid position to center of the new room
-                target_room_obj = self.game.rooms[target_room]
-                player2.grid_x = (target_room_obj.grid_size) // 2
-                player2.grid_y = (target_room_obj.grid_size) // 2
-                
-                # Update absolute position
-                player2.pos = [
-                    player2.grid_x * player2.tile_size + player2.tile_size // 2,
-                    player2.grid_y * player2.tile_size + player2.tile_size // 2
-                ]
+            available_moves = self.sim.maze.transitions[self.sim.player2_room]
+            available_moves = available_moves[available_moves >= 0]
+            if len(available_moves):
+                self.sim.player2_room = int(random.choice(available_moves))
 
     def _get_reward(self, action):
         """
         Calculate the reward based on the current state.
         """
-        reward = 0
-        
-        # Reward for getting closer to the target
-        previous_distance = self.game.previous_distance_room
-        current_distance = nx.shortest_path_length(
-            self.game.graph, 
-            self.game.player1.current_room, 
-            self.game.player2.current_room
+        # Reward for getting closer to the target and for reaching it,
+        # minus the time and idle penalties (see src.ai.rewards)
+        current_distance = self.sim.maze.shortest_path_length(
+            self.sim.player1_room,
+            self.sim.player2_room
         )
-        
-        if current_distance < previous_distance:
-            reward += 1  # Reward for getting closer 1
-        
-        # Reward for reaching the target
-        if self.game.check_collision_between_player():
-            reward += 5 #10
-        
-        # Small time penalty
-        reward -= 0.1
-        
-        # Movement metrics
-        metrics = self.game.player1.get_movement_metrics()
-        
-        # Penalize idle time
-        # reward += -0.1 * metrics['idle_time']
-        
-        # Reward movement
-        reward += 0.5 if metrics['is_moving'] else -0.2
-
-              
-        
-        return reward
-    
-    def unauthorized_moves(self, action, player):
-        action_map = {
-            0: "UP",
-            1: "DOWN", 
-            2: "LEFT", 
-            3: "RIGHT",
-            4: "STOP"
-        }
-        direction = action_map[action]
-
-        if direction == "UP":
-            target_room = player.current_room - self.game.NUM_COLS
-        elif direction == "DOWN":
-            target_room = player.current_room + self.game.NUM_COLS
-        elif direction == "LEFT":
-            target_room = player.current_room - 1
-        elif direction == "RIGHT":
-            target_room = player.current_room + 1
-
-        if target_room in self.game.graph.neighbors(player.current_room):
-            return False
-        else:
-            return True
+        caught = self.sim.check_collision_between_player()
+        return shaped_reward(self.sim.previous_distance_room, current_distance, caught)
+
+    def unauthorized_moves(self, action, room):
+        return not self.sim.maze.is_valid_move(room, action)
+
+    def policy(self):
+        """
+        Policy of the current maze from the policy store (None without a store
+        or without a policy for this layout). Follows maze regenerations.
+        """
+        if self.policy_store is None:
+            return None
+        return self.policy_store.get(self.sim.maze)
+
+    def action_masks(self):
+        """
+        Boolean mask of the actions that do not hit a wall from player1's room.
+        """
+        return self.sim.maze.action_mask(self.sim.player1_room)
+
+    def _sync_renderer(self):
+        """
+        Copy the simulated player rooms into the pygame renderer.
+        """
+        self.renderer.player1.current_room = self.sim.player1_room
+        self.renderer.player2.current_room = self.sim.player2_room
 
     def render(self, mode='human'):
         """
         Render the environment.
         """
+        # pygame is only imported (and the window only opened) when rendering
+        import pygame as pg
+        from src.core.Game import MazeGame
+
+        if self.renderer is None:
+            self.renderer = MazeGame(maze=self.sim.maze)
+            self.screen = self.renderer.screen
+            self.clock = pg.time.Clock()
+        elif self.renderer.maze is not self.sim.maze:
+            self.renderer.set_maze(self.sim.maze)
+        self._sync_renderer()
+
         if mode == 'human':
-            if self.screen is None:
-                pg.init()
-                self.screen = pg.display.set_mode((self.game.WIDTH, self.game.HEIGHT))
-                self.clock = pg.time.Clock()
-            
-            self.game.draw()
+            self.renderer.draw()
             pg.display.flip()
             self.clock.tick(self.metadata['render_fps'])
-        
+
         elif mode == 'rgb_array':
-            return pg.surfarray.array3d(self.game.screen)
+            self.renderer.draw()
+            return pg.surfarray.array3d(self.renderer.screen)
 
     def close(self):
         """
         Close the environment and free resources.
         """
-        if self.screen is not None:
+        if self.renderer is not None:
+            import pygame as pg
             pg.quit()
-            self.screen = None
\ No newline at end of file
+            self.renderer = None
+            self.screen = None
@@ -0,0 +1,51 @@
+import numpy as np
+from src.ai.model_io import save_policy, load_policy
+from src.world.Maze import DIRECTIONS
+
+class PolicyTable:
+    """
+    Greedy policy compiled from a Q-table into one uint8 action per
+    (player_room, target_room). Serving a query is a single array index,
+    whatever the dtype of the Q-table it came from.
+    """
+    def __init__(self, actions, action_count=len(DIRECTIONS)):
+        self.actions = actions
+        self.action_count = action_count
+
+    @classmethod
+    def from_q_table(cls, q_table, maze=None):
+        """
+        Compile the argmax of every Q-table row.
+
+        Parameters:
+        - q_table: NUM_ROOMS x NUM_ROOMS x actions array
+        - maze: If given, actions into a wall are never chosen
+        """
+        q_table = np.asarray(q_table, dtype=np.float64)
+        if maze is not None:
+            walls = maze.transitions[:, None, :] < 0
+            q_table = np.where(walls, -np.inf, q_table)
+        actions = np.argmax(q_table, axis=-1).astype(np.uint8)
+        return cls(actions, action_count=q_table.shape[-1])
+
+    def action(self, player_room, target_room):
+        """Action for one (player_room, target_room) query."""
+        return int(self.actions[player_room, target_room])
+
+    def batch_actions(self, player_rooms, target_rooms):
+        """Actions for many robots at once with one fancy-index."""
+        return self.actions[player_rooms, target_rooms]
+
+    def direction(self, player_room, target_room):
+        return DIRECTIONS[self.actions[player_room, target_room]]
+
+    def save(self, filename, maze, **extra):
+        return save_policy(filename, self.actions, maze, self.action_count, **extra)
+
+    @classmethod
+    def load(cls, filename, maze=None, mmap_mode='r'):
+        """
+        Load a saved policy, refusing (ModelMismatchError) one compiled for another maze.
+        """
+        actions, header = load_policy(filename, maze=maze, mmap_mode=mmap_mode)
+        return cls(actions, action_count=header['action_count'])
@@ -0,0 +1,102 @@
+import numpy as np
+from src.ai.ReplayBuffer import ReplayBuffer
+
+class SumTree:
+    """
+    Binary tree stored in a flat array where every node holds the sum of its
+    children and the leaves hold the priorities. Updates and proportional
+    lookups are O(log n) and take whole index/value arrays at once.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.depth = int(np.ceil(np.log2(max(capacity, 2))))
+        self.leaf_offset = 1 << self.depth
+        # Node 1 is the root, the children of node i are 2i and 2i + 1
+        self.tree = np.zeros(2 * self.leaf_offset, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def priorities(self, indices):
+        return self.tree[self.leaf_offset + np.asarray(indices)]
+
+    def update(self, indices, priorities):
+        """Set the priorities of the leaves and recompute their ancestors level by level."""
+        nodes = self.leaf_offset + np.asarray(indices, dtype=np.int64)
+        self.tree[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        """
+        Leaf index of each value in [0, total), i.e. the first leaf whose
+        cumulative priority exceeds it.
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = self.tree[2 * nodes]
+            go_right = values >= left
+            values -= left * go_right
+            nodes = 2 * nodes + go_right
+        return np.minimum(nodes - self.leaf_offset, self.capacity - 1)
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Replay memory sampling transitions in proportion to priority^alpha,
+    where the priority is the last absolute TD error of the transition
+    (Schaul et al., Prioritized Experience Replay). New transitions get the
+    highest priority seen so far, so they are replayed at least once.
+    """
+    def __init__(self, capacity, state_size, alpha=0.6, beta=0.4, beta_increment=0.001,
+                 epsilon=1e-6, **kwargs):
+        """
+        Parameters:
+        - capacity: Maximum number of transitions, the oldest are overwritten
+        - state_size: Length of a state vector
+        - alpha: How much prioritization is used (0 is uniform sampling)
+        - beta: Initial importance-sampling exponent, annealed towards 1
+        - beta_increment: Increase of beta at every sample
+        - epsilon: Added to the TD errors so that no priority is zero
+        """
+        super().__init__(capacity, state_size, **kwargs)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity)
+
+    def add(self, state, action, reward, next_state, done):
+        index = super().add(state, action, reward, next_state, done)
+        self.tree.update([index], [self.max_priority ** self.alpha])
+        return index
+
+    def sample(self, batch_size):
+        """
+        Sample batch_size transitions in proportion to their priority, one
+        from each of batch_size equal slices of the total priority.
+
+        Returns:
+        - (states, actions, rewards, next_states, dones, indices, weights),
+          weights are the importance-sampling weights normalized to a maximum of 1
+        """
+        total = self.tree.total
+        segment = total / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        indices = np.minimum(self.tree.find(values), self.size - 1)
+
+        probabilities = self.tree.priorities(indices) / total
+        weights = (self.size * probabilities) ** -self.beta
+        weights /= weights.max()
+        self.beta = min(1.0, self.beta + self.beta_increment)
+
+        return self.gather(indices) + (indices, weights.astype(np.float32))
+
+    def update_priorities(self, indices, td_errors):
+        """Set the priorities of the sampled transitions from their new TD errors."""
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
@@ -1,10 +1,20 @@
 import numpy as np
-import gymnasium as gym
-from config import load_config
-from src.ai.MazeEnv import MazeEnv
+from src.ai.rollout import SharedQTable, rollout_worker
+from src.ai.planner import solve_q_table
+from src.ai.model_io import save_q_model, load_q_model, model_paths, ModelMismatchError
+from src.ai.PolicyTable import PolicyTable
+from src.ai.exploration import epsilon_greedy
+from src.ai.evaluation import evaluate_policy, summarize
+from src.utils.logger import get_logger, SampledLogger, MetricsAggregator
+import logging
+import multiprocessing as mp
 import os
 import pickle
+import queue
 import time
+import warnings
+
+logger = get_logger(__name__)
 
 class QLearningAgent:
     def __init__(self, env, learning_rate=0.1, discount_factor=0.99, 
@@ -28,11 +38,12 @@ class QLearningAgent:
         self.min_epsilon = min_exploration
         
         # Obtain maze dimensions
-        self.num_rooms = env.game.NUM_ROOMS
+        self.num_rooms = env.sim.NUM_ROOMS
         
         # Define Q-table dimensions
         state_size = (self.num_rooms, self.num_rooms)
-        action_size = env.action_space.n
+        # Vector environments expose the per-environment space separately
+        action_size = getattr(env, 'single_action_space', env.action_space).n
         
         # Initialize Q-table
         self.q_table = np.zeros(state_size + (action_size,))
@@ -52,82 +63,315 @@ class QLearningAgent:
         #print(f"player_room = {player_room}, target_room = {target_room}")
         return (player_room, target_room)
 
-    def train(self, num_episodes=200, max_steps_per_episode=200):
+    def act_batch(self, states, epsilon=None):
+        """
+        Epsilon-greedy actions for a batch of states with one RNG call and
+        one Q-table lookup
+        
+        Parameters:
+        - states: B x 2 array of (player_room, target_room)
+        - epsilon: Exploration rate, a scalar or one per state (defaults to the agent's)
+        """
+        states = np.asarray(states, dtype=np.int64)
+        epsilon = self.epsilon if epsilon is None else epsilon
+        return epsilon_greedy(self.q_table[states[:, 0], states[:, 1]], epsilon)
+
+    def update(self, state, action, reward, next_state):
+        """
+        Apply the Q-learning update for a single transition
+        """
+        old_value = self.q_table[state + (action,)]
+        next_max = np.max(self.q_table[next_state])
+        
+        new_value = (1 - self.alpha) * old_value + self.alpha * (reward + self.gamma * next_max)
+        self.q_table[state + (action,)] = new_value
+
+    def update_batch(self, states, actions, rewards, next_states, dones=None):
+        """
+        Apply the Q-learning update for a batch of transitions at once.
+        All the targets are computed from the Q-table as it was before the
+        batch. A state-action pair seen k times in the batch gets the effect
+        of k sequential updates towards the mean of its targets:
+        q <- (1 - alpha)^k * q + (1 - (1 - alpha)^k) * mean_target
+        
+        Parameters:
+        - states: B x 2 array of (player_room, target_room)
+        - actions: B actions
+        - rewards: B rewards
+        - next_states: B x 2 array of next states
+        - dones: B flags, True where the episode terminated (no bootstrap)
+        """
+        states = np.asarray(states, dtype=np.int64)
+        next_states = np.asarray(next_states, dtype=np.int64)
+        actions = np.asarray(actions, dtype=np.int64)
+        rewards = np.asarray(rewards, dtype=np.float64)
+
+        next_max = self.q_table[next_states[:, 0], next_states[:, 1]].max(axis=1)
+        if dones is not None:
+            next_max = np.where(dones, 0.0, next_max)
+        targets = rewards + self.gamma * next_max
+
+        # Group the duplicated state-action pairs by their flat index
+        index = np.ravel_multi_index((states[:, 0], states[:, 1], actions), self.q_table.shape)
+        index, inverse, counts = np.unique(index, return_inverse=True, return_counts=True)
+        mean_targets = np.bincount(inverse, weights=targets, minlength=len(index)) / counts
+
+        # Index the table itself: reshape(-1) would copy a non-contiguous table
+        entries = np.unravel_index(index, self.q_table.shape)
+        keep = (1 - self.alpha) ** counts
+        self.q_table[entries] = keep * self.q_table[entries] + (1 - keep) * mean_targets
+
+    def _end_episode(self, total_episode_reward, total_rewards_per_episode, metrics):
+        """
+        Decay exploration, record the episode reward and log progress
+        """
+        # Decay exploration rate
+        self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay)
+        
+        total_rewards_per_episode.append(total_episode_reward)
+        
+        # Record training history
+        self.training_history['episode_rewards'].append(total_episode_reward)
+        
+        # Log a progress summary every 100 episodes
+        summary = metrics.record(reward=total_episode_reward, epsilon=self.epsilon)
+        if summary:
+            self.training_history['average_rewards'].append(summary['reward'])
+
+    def train(self, num_episodes=200, max_steps_per_episode=None, debug_every=100):
         """
         Train the Q-Learning agent
         
         Parameters:
         - num_episodes: Number of training episodes
-        - max_steps_per_episode: Maximum steps in each episode
+        - max_steps_per_episode: Maximum steps in each episode, applied as the
+          environment's max_episode_steps while training (defaults to the env's)
+        - debug_every: Log one in this many steps at DEBUG level
         """
         total_rewards_per_episode = []
+        metrics = MetricsAggregator(logger, every=100, prefix="Training episodes")
+        # Checked once, so that the step loop pays nothing when debug is off
+        debug = logger.isEnabledFor(logging.DEBUG)
+        step_log = SampledLogger(logger, every=debug_every)
+        # The env truncates the episodes, so it owns the only step budget
+        env_max_steps = self.env.max_episode_steps
+        if max_steps_per_episode is not None:
+            self.env.max_episode_steps = max_steps_per_episode
 
-        for episode in range(num_episodes):
-            # Reset environment
-            state, _ = self.env.reset()
-            state = self.discretize_state(state)
+        try:
+            for episode in range(num_episodes):
+                # Reset environment
+                state, _ = self.env.reset()
+                state = self.discretize_state(state)
             
-            total_episode_reward = 0
-            done = False
+                total_episode_reward = 0
+                done = False
             
-            for step in range(max_steps_per_episode):
-                # Action selection (exploration vs exploitation)
-                if np.random.rand() < self.epsilon:
-                    action = self.env.action_space.sample()  # Exploration
-                else:
-                    action = np.argmax(self.q_table[state])  # Exploitation
-                print(f"\n\n\n\n\n[DEBUG]action: {action}")
-                print(f"[DEBUG]state: {state}")
-                # Execute action
-                next_state, reward, done, truncated, info = self.env.step(action)
-                print(f"[DEBUG]pre discretize: {next_state}")
-                next_state = self.discretize_state(next_state)
-                print(f"[DEBUG]next_state: {next_state}\n\n\n\n")
-                # Q-table update
-                old_value = self.q_table[state + (action,)]
-                next_max = np.max(self.q_table[next_state])
-                
-                new_value = (1 - self.alpha) * old_value + self.alpha * (reward + self.gamma * next_max)
-                self.q_table[state + (action,)] = new_value
+                for step in range(self.env.max_episode_steps):
+                    # Action selection (exploration vs exploitation)
+                    if np.random.rand() < self.epsilon:
+                        action = self.env.action_space.sample()  # Exploration
+                    else:
+                        action = np.argmax(self.q_table[state])  # Exploitation
+                    # Execute action
+                    next_state, reward, done, truncated, info = self.env.step(action)
+                    next_state = self.discretize_state(next_state)
+                    if debug:
+                        step_log.debug("episode %d step %d: state %s action %s -> %s reward %.2f",
+                                       episode, step, state, action, next_state, reward)
+                    # Q-table update
+                    self.update(state, action, reward, next_state)
                 
-                total_episode_reward += reward
-                state = next_state
+                    total_episode_reward += reward
+                    state = next_state
                 
-                if done or truncated:
-                    break
-            
-            # Decay exploration rate
-            self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay)
-            
-            total_rewards_per_episode.append(total_episode_reward)
+                    if done or truncated:
+                        break
             
-            # Record training history
-            self.training_history['episode_rewards'].append(total_episode_reward)
-            
-            # Print progress
-            if (episode + 1) % 100 == 0:
-                avg_reward = np.mean(total_rewards_per_episode[-100:])
-                self.training_history['average_rewards'].append(avg_reward)
-                print(f"Episode: {episode + 1}, Average Reward: {avg_reward:.2f}, Epsilon: {self.epsilon:.2f}")
+                self._end_episode(total_episode_reward, total_rewards_per_episode, metrics)
+        finally:
+            self.env.max_episode_steps = env_max_steps
         
         return self.q_table
 
-    def test(self, num_tests=5, render=True, max_steps=2000):
+    def train_parallel(self, num_episodes=200, max_steps_per_episode=200, num_workers=None,
+                       batch_size=1024, sync_interval=4, seed=None):
+        """
+        Train the Q-Learning agent with a pool of rollout worker processes.
+        Each worker steps its own MazeEnv on a copy of this env's maze and
+        streams transition batches back, this process applies the Q-updates
+        and broadcasts the Q-table to the workers every sync_interval batches.
+        Raises RuntimeError if a worker dies before training is over.
+        
+        Parameters:
+        - num_episodes: Number of training episodes (summed over all workers)
+        - max_steps_per_episode: Maximum steps in each episode
+        - num_workers: Number of worker processes (defaults to the number of cores)
+        - batch_size: Transitions sent by a worker in each batch
+        - sync_interval: Batches applied between two Q-table broadcasts
+        - seed: Seed used to derive the seeds of the workers' environments
+        """
+        num_workers = num_workers or os.cpu_count()
+        worker_seeds = np.random.SeedSequence(seed).generate_state(num_workers)
+        total_rewards_per_episode = []
+        metrics = MetricsAggregator(logger, every=100, prefix="Training episodes")
+
+        ctx = mp.get_context()
+        shared_q = SharedQTable(ctx, self.q_table, self.epsilon)
+        transition_queue = ctx.Queue(maxsize=2 * num_workers)
+        stop_event = ctx.Event()
+        maze_bytes = self.env.sim.maze.to_bytes()
+        workers = [
+            ctx.Process(
+                target=rollout_worker,
+                args=(int(worker_seed), shared_q, transition_queue, stop_event,
+                      batch_size, max_steps_per_episode, maze_bytes),
+                daemon=True
+            )
+            for worker_seed in worker_seeds
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            num_batches = 0
+            while len(total_rewards_per_episode) < num_episodes:
+                # Workers only exit once stop_event is set, any earlier exit is a crash
+                for worker in workers:
+                    if worker.exitcode is not None:
+                        raise RuntimeError(
+                            f"Rollout worker {worker.pid} exited with code {worker.exitcode} during training"
+                        )
+                try:
+                    batch = transition_queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                self.update_batch(batch['states'], batch['actions'], batch['rewards'],
+                                  batch['next_states'], batch['dones'])
+
+                # A batch can close more episodes than are still needed
+                remaining = num_episodes - len(total_rewards_per_episode)
+                for total_episode_reward in batch['episode_rewards'][:remaining]:
+                    self._end_episode(total_episode_reward, total_rewards_per_episode, metrics)
+
+                num_batches += 1
+                if num_batches % sync_interval == 0:
+                    shared_q.publish(self.q_table, self.epsilon)
+        finally:
+            stop_event.set()
+            # Drain the queue so that no worker stays blocked on a put
+            while any(worker.is_alive() for worker in workers):
+                try:
+                    transition_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            for worker in workers:
+                worker.join()
+            shared_q.close(unlink=True)
+
+        return self.q_table
+
+    def train_vectorized(self, num_episodes=200):
+        """
+        Train the Q-Learning agent on a VecMazeEnv: every step collects one
+        transition per environment and applies them with a single update_batch.
+        Episode length is bounded by the environment's max_episode_steps.
+        
+        Parameters:
+        - num_episodes: Number of training episodes (summed over all environments)
+        """
+        total_rewards_per_episode = []
+        metrics = MetricsAggregator(logger, every=100, prefix="Training episodes")
+        num_envs = self.env.num_envs
+
+        states, _ = self.env.reset()
+        episode_rewards = np.zeros(num_envs)
+
+        while len(total_rewards_per_episode) < num_episodes:
+            # Action selection (exploration vs exploitation)
+            actions = self.act_batch(states)
+            next_states, rewards, terminations, truncations, infos = self.env.step(actions)
+            dones = terminations | truncations
+
+            # Finished environments are already reset, learn from their final state
+            final_states = np.where(dones[:, None], infos.get('final_obs', next_states), next_states)
+            self.update_batch(states, actions, rewards, final_states, terminations)
+
+            episode_rewards += rewards
+            remaining = num_episodes - len(total_rewards_per_episode)
+            for total_episode_reward in episode_rewards[dones][:remaining]:
+                self._end_episode(float(total_episode_reward), total_rewards_per_episode, metrics)
+            episode_rewards[dones] = 0
+            states = next_states
+
+        return self.q_table
+
+    def solve(self, tol=1e-6, max_iterations=10000):
+        """
+        Compute the Q-table by value iteration on the known maze dynamics
+        instead of sampling episodes. The result can be saved with save_model.
+        
+        Parameters:
+        - tol: Convergence threshold on the Q-values
+        - max_iterations: Maximum number of sweeps
+        """
+        self.q_table, iterations = solve_q_table(
+            self.env.sim.maze, discount_factor=self.gamma, tol=tol, max_iterations=max_iterations
+        )
+        logger.info("Q-table solved in %d iterations", iterations)
+        return self.q_table
+
+    def evaluate(self, num_episodes=None, max_steps=None, num_workers=None, seed=None):
+        """
+        Evaluate the greedy policy headlessly, without rendering or delays
+        
+        Parameters:
+        - num_episodes: Number of random starts, None evaluates every (start, target) pair
+        - max_steps: Maximum steps per episode (defaults to the environment's step budget)
+        - num_workers: Split the episodes over this many processes
+        - seed: Seed of the sampled starts
+        
+        Returns:
+        - (per-episode result arrays, summary dict), see src.ai.evaluation
+        """
+        if max_steps is None:
+            max_steps = self.env.max_episode_steps
+        # Plain argmax, moves into walls are counted as illegal
+        actions = np.argmax(self.q_table, axis=-1)
+        results = evaluate_policy(self.env.sim.maze, actions, num_episodes=num_episodes,
+                                  max_steps=max_steps, num_workers=num_workers, seed=seed)
+        summary = summarize(results)
+        logger.info("Evaluation over %d episodes: success rate %.3f, steps to catch p50 %.1f / p90 %.1f, "
+                    "illegal-move rate %.4f", summary['episodes'], summary['success_rate'],
+                    summary['p50_steps_to_catch'], summary['p90_steps_to_catch'], summary['illegal_move_rate'])
+        return results, summary
+
+    def test(self, num_tests=5, interactive=False, max_steps=2000, step_delay=1.0, render=None):
         """
         Test the trained Q-Learning agent
         
         Parameters:
         - num_tests: Number of test runs
-        - render: Whether to render the environment
+        - interactive: Step the environment, render it and wait step_delay
+          seconds between steps; otherwise run the headless evaluation
         - max_steps: Maximum steps per test run
+        - step_delay: Seconds between two steps in interactive mode
+        - render: Deprecated alias of interactive
         
         Returns:
         - List of total rewards for each test run
         """
+        if render is not None:
+            warnings.warn("test(render=...) is deprecated, use interactive=...", DeprecationWarning, stacklevel=2)
+            interactive = render
+        if not interactive:
+            results, _ = self.evaluate(num_episodes=num_tests, max_steps=max_steps)
+            return results['rewards'].tolist()
+
         test_rewards = []
         
         for test in range(num_tests):
-            print(f"\nTest Run {test + 1}")
+            logger.info("Test Run %d", test + 1)
             
             # Reset environment
             state, _ = self.env.reset()
@@ -144,51 +388,76 @@ class QLearningAgent:
                 # Execute action
                 next_state, reward, done, truncated, info = self.env.step(action)
                 next_state = self.discretize_state(next_state)
-                #print(f"State: {state}")
-                print(f"\Action {action}")
-                print(f"q_table: {self.q_table[state]}")
+                logger.debug("action %s, q_table: %s", action, self.q_table[state])
                 
                 state = next_state
                 total_reward += reward
                 steps += 1
-                time.sleep(1)
-                # Render if specified
-                if render:
-                    self.env.render()
+                time.sleep(step_delay)
+                self.env.render()
             
-            print(f"Total Reward: {total_reward}")
-            print(f"Steps Executed: {steps}")
+            logger.info("Total Reward: %s, Steps Executed: %d", total_reward, steps)
             
             test_rewards.append(total_reward)
         
         return test_rewards
 
-    def save_model(self, filename='q_learning_model.pkl'):
+    def export_policy(self, filename=None):
+        """
+        Compile the Q-table into a greedy uint8 policy table (walls masked)
+        
+        Parameters:
+        - filename: If given, also save the policy there
+        """
+        policy = PolicyTable.from_q_table(self.q_table, self.env.sim.maze)
+        if filename is not None:
+            array_path, _ = policy.save(filename, self.env.sim.maze)
+            logger.info("Policy exported to %s", array_path)
+        return policy
+
+    def save_model(self, filename='q_learning_model.npy'):
         """
-        Save the trained Q-table to a file
+        Save the trained Q-table as a raw .npy array plus a .json header
+        with the maze dimensions, layout hash, dtype and action count
         
         Parameters:
         - filename: Path to save the model
         """
-        with open(filename, 'wb') as f:
-            pickle.dump({
-                'q_table': self.q_table,
-                'training_history': self.training_history
-            }, f)
-        print(f"Model saved to {filename}")
+        array_path, _ = save_q_model(
+            filename, self.q_table, self.env.sim.maze,
+            episodes=len(self.training_history.get('episode_rewards', [])),
+            average_rewards=[float(r) for r in self.training_history.get('average_rewards', [])]
+        )
+        logger.info("Model saved to %s", array_path)
 
-    def load_model(self, filename='q_learning_model.pkl'):
+    def load_model(self, filename='q_learning_model.npy', mmap=False):
         """
-        Load a previously saved Q-table
+        Load a previously saved Q-table. Raises ModelMismatchError if the model
+        was trained on a different maze. Legacy pickled models (.pkl) are still
+        read, without any layout check.
         
         Parameters:
         - filename: Path to load the model from
+        - mmap: Memory-map the Q-table read-only instead of reading it (for serving)
         """
-        if os.path.exists(filename):
+        _, header_path = model_paths(filename)
+        if filename.endswith('.pkl') and os.path.exists(filename):
             with open(filename, 'rb') as f:
                 data = pickle.load(f)
                 self.q_table = data['q_table']
                 self.training_history = data.get('training_history', {})
-            print(f"Model loaded from {filename}")
+            logger.warning("Loaded legacy pickled model %s, re-save it to get the layout check", filename)
+        elif os.path.exists(header_path):
+            q_table, header = load_q_model(filename, maze=self.env.sim.maze, mmap_mode='r' if mmap else None)
+            if header['action_count'] != self.q_table.shape[-1]:
+                raise ModelMismatchError(
+                    f"Model has {header['action_count']} actions, the environment has {self.q_table.shape[-1]}"
+                )
+            self.q_table = q_table
+            self.training_history = {
+                'episode_rewards': [],
+                'average_rewards': header.get('average_rewards', [])
+            }
+            logger.info("Model loaded from %s", filename)
         else:
-            print(f"No model found at {filename}")
\ No newline at end of file
+            logger.warning("No model found at %s", filename)
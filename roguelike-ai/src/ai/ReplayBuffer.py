@@ -0,0 +1,92 @@
+import numpy as np
+
+class ReplayBuffer:
+    """
+    Replay memory backed by preallocated NumPy arrays used as a ring buffer.
+    Insertion is O(1), sampling draws a vector of indices and gathers the
+    batch with np.take into reused batch arrays, so no per-sample Python
+    objects are ever created. Memory use is fixed at construction (see nbytes).
+    """
+    def __init__(self, capacity, state_size, batch_size=32, state_dtype=np.float32, rng=None):
+        """
+        Parameters:
+        - capacity: Maximum number of transitions, the oldest are overwritten
+        - state_size: Length of a state vector
+        - batch_size: Size of the batch arrays preallocated for sample
+        - state_dtype: dtype used to store states and next_states
+        - rng: NumPy Generator used for sampling
+        """
+        self.capacity = capacity
+        self.state_size = state_size
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.states = np.zeros((capacity, state_size), dtype=state_dtype)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=state_dtype)
+        self.dones = np.zeros(capacity, dtype=bool)
+
+        self.position = 0
+        self.size = 0
+        self._allocate_batch(batch_size)
+
+    def _allocate_batch(self, batch_size):
+        self.batch_size = batch_size
+        self._batch = {
+            'states': np.zeros((batch_size, self.state_size), dtype=self.states.dtype),
+            'actions': np.zeros(batch_size, dtype=self.actions.dtype),
+            'rewards': np.zeros(batch_size, dtype=self.rewards.dtype),
+            'next_states': np.zeros((batch_size, self.state_size), dtype=self.next_states.dtype),
+            'dones': np.zeros(batch_size, dtype=self.dones.dtype),
+        }
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.states, self.actions, self.rewards, self.next_states, self.dones))
+
+    def add(self, state, action, reward, next_state, done):
+        """
+        Store one transition, overwriting the oldest one when full.
+
+        Returns:
+        - Index of the slot that was written
+        """
+        index = self.position
+        self.states[index] = np.ravel(state)
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.next_states[index] = np.ravel(next_state)
+        self.dones[index] = done
+        self.position = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return index
+
+    def gather(self, indices):
+        """
+        Gather the transitions at indices into the batch arrays. The arrays
+        are reused, so they are overwritten by the next sample or gather.
+
+        Returns:
+        - (states, actions, rewards, next_states, dones)
+        """
+        if len(indices) != self.batch_size:
+            self._allocate_batch(len(indices))
+        batch = self._batch
+        np.take(self.states, indices, axis=0, out=batch['states'])
+        np.take(self.actions, indices, out=batch['actions'])
+        np.take(self.rewards, indices, out=batch['rewards'])
+        np.take(self.next_states, indices, axis=0, out=batch['next_states'])
+        np.take(self.dones, indices, out=batch['dones'])
+        return batch['states'], batch['actions'], batch['rewards'], batch['next_states'], batch['dones']
+
+    def sample(self, batch_size):
+        """
+        Sample batch_size transitions uniformly, with replacement.
+
+        Returns:
+        - (states, actions, rewards, next_states, dones), see gather
+        """
+        return self.gather(self.rng.integers(0, self.size, size=batch_size))
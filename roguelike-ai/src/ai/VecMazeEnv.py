@@ -0,0 +1,125 @@
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import VectorEnv, AutoresetMode
+from gymnasium.vector.utils import batch_space
+from config import load_config
+from src.core.Simulation import MazeSimulation
+from src.ai.rewards import shaped_rewards
+from src.world.Maze import DIRECTIONS
+
+class VecMazeEnv(VectorEnv):
+    """
+    Batch of N maze environments sharing the same layout, stepped together with
+    NumPy array operations. Player rooms, step counters and done flags live in
+    arrays, and finished environments are reset in the same step.
+    """
+    metadata = {'autoreset_mode': AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs=8, config=None, max_episode_steps=None):
+        self.config = config if config is not None else load_config()
+        self.num_envs = num_envs
+        if max_episode_steps is None:
+            max_episode_steps = self.config['env']['max_episode_steps']
+        self.max_episode_steps = max_episode_steps
+
+        # The simulation only provides the maze layout shared by all the environments
+        self.sim = MazeSimulation(self.config, rng=self.np_random)
+        # Tables are compiled once by the maze and shared
+        self.transitions = self.sim.maze.transitions
+        self.distance = self.sim.maze.distance
+        self.next_hop = self.sim.maze.next_hop
+
+        # 0: UP, 1: DOWN, 2: LEFT, 3: RIGHT
+        self.single_action_space = spaces.Discrete(len(DIRECTIONS))
+        self.single_observation_space = spaces.Box(
+            low=0, high=self.sim.NUM_ROOMS - 1,
+            shape=(2,),  # Player 1 and Player 2 current rooms
+            dtype=np.int32
+        )
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+
+        self.player_rooms = np.zeros(num_envs, dtype=np.int32)
+        self.target_rooms = np.zeros(num_envs, dtype=np.int32)
+        self.previous_distance = np.zeros(num_envs, dtype=np.int16)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.dones = np.zeros(num_envs, dtype=bool)
+
+    def _get_state(self):
+        return np.stack([self.player_rooms, self.target_rooms], axis=1)
+
+    def _respawn(self, mask):
+        """
+        Spawn player and target in two distinct random rooms for the masked environments.
+        """
+        count = int(np.count_nonzero(mask))
+        if count == 0:
+            return
+        player = self.np_random.integers(0, self.sim.NUM_ROOMS, size=count)
+        # Sample among the other NUM_ROOMS - 1 rooms and skip over the player's one
+        target = self.np_random.integers(0, self.sim.NUM_ROOMS - 1, size=count)
+        target += target >= player
+
+        self.player_rooms[mask] = player
+        self.target_rooms[mask] = target
+        self.previous_distance[mask] = self.distance[player, target]
+        self.steps[mask] = 0
+
+    def reset(self, *, seed=None, options=None):
+        """
+        Reset all the environments and return the batch of initial states.
+        """
+        super().reset(seed=seed)
+        self._respawn(np.ones(self.num_envs, dtype=bool))
+        self.dones[:] = False
+        return self._get_state(), {}
+
+    def action_masks(self):
+        """
+        N x 4 boolean mask of the actions that do not hit a wall.
+        """
+        return self.transitions[self.player_rooms] >= 0
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        self.steps += 1
+
+        # Moves into a wall are penalized and end the episode without changing the state
+        target_rooms = self.transitions[self.player_rooms, actions]
+        legal = target_rooms >= 0
+        self.player_rooms = np.where(legal, target_rooms, self.player_rooms)
+
+        # Player2 moves one room along the shortest path to player1
+        hops = self.next_hop[self.target_rooms, self.player_rooms].astype(np.int32)
+        no_path = legal & (hops < 0)
+        if no_path.any():
+            # If no path exists, choose a random neighboring room
+            options = self.transitions[self.target_rooms[no_path]]
+            keys = self.np_random.random(options.shape) * (options >= 0)
+            hops[no_path] = np.where(
+                (options >= 0).any(axis=1),
+                options[np.arange(len(options)), keys.argmax(axis=1)],
+                self.target_rooms[no_path]
+            )
+        self.target_rooms = np.where(legal, hops, self.target_rooms)
+
+        # Same shaping as MazeEnv._get_reward
+        current_distance = self.distance[self.player_rooms, self.target_rooms]
+        caught = legal & (self.player_rooms == self.target_rooms)
+        rewards = shaped_rewards(self.previous_distance, current_distance, caught, legal)
+        self.previous_distance = np.where(legal, current_distance, self.previous_distance)
+
+        # Illegal moves and exhausted step budgets truncate the episode
+        terminations = caught
+        truncations = ~caught & (~legal | (self.steps >= self.max_episode_steps))
+        self.dones = terminations | truncations
+
+        states = self._get_state()
+        infos = {}
+        if self.dones.any():
+            infos['final_obs'] = states.copy()
+            infos['_final_obs'] = self.dones.copy()
+            self._respawn(self.dones)
+            states = self._get_state()
+
+        return states, rewards, terminations, truncations, infos
@@ -0,0 +1,30 @@
+"""
+Agents, environments and model utilities. The submodules are imported on
+first attribute access, so `from src.ai import QLearningAgent` does not load
+gymnasium, pygame or keras unless the requested class needs them.
+"""
+import importlib
+
+_EXPORTS = {
+    'DQNAgent': 'src.ai.DQNAgent',
+    'MazeEnv': 'src.ai.MazeEnv',
+    'ModelMismatchError': 'src.ai.model_io',
+    'NumpyMLP': 'src.ai.NumpyMLP',
+    'PolicyTable': 'src.ai.PolicyTable',
+    'PrioritizedReplayBuffer': 'src.ai.PrioritizedReplayBuffer',
+    'QLearningAgent': 'src.ai.QLearningAgent',
+    'ReplayBuffer': 'src.ai.ReplayBuffer',
+    'VecMazeEnv': 'src.ai.VecMazeEnv',
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
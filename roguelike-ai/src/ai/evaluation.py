@@ -0,0 +1,120 @@
+import multiprocessing as mp
+import numpy as np
+from src.ai.planner import build_model
+
+def all_pairs(num_rooms):
+    """Every (player_room, target_room) start with two distinct rooms."""
+    players, targets = np.nonzero(~np.eye(num_rooms, dtype=bool))
+    return np.stack([players, targets], axis=1)
+
+def sample_starts(num_rooms, num_episodes, rng):
+    """num_episodes random starts with two distinct rooms, as MazeEnv spawns them."""
+    players = rng.integers(0, num_rooms, size=num_episodes)
+    targets = rng.integers(0, num_rooms - 1, size=num_episodes)
+    targets += targets >= players
+    return np.stack([players, targets], axis=1)
+
+def _run_episodes(model, transitions, actions, starts, max_steps):
+    """
+    Play the greedy policy from every start in lockstep on the compiled model.
+    """
+    next_states, rewards, terminal = model
+    num_rooms = actions.shape[0]
+    num_episodes = len(starts)
+    players = starts[:, 0].astype(np.int64)
+    targets = starts[:, 1].astype(np.int64)
+
+    steps = np.zeros(num_episodes, dtype=np.int64)
+    total_rewards = np.zeros(num_episodes)
+    caught = np.zeros(num_episodes, dtype=bool)
+    illegal = np.zeros(num_episodes, dtype=bool)
+    active = np.arange(num_episodes)
+
+    for _ in range(max_steps):
+        if len(active) == 0:
+            break
+        player, target = players[active], targets[active]
+        action = actions[player, target].astype(np.int64)
+        legal = transitions[player, action] >= 0
+        ended = terminal[player, target, action]
+
+        total_rewards[active] += rewards[player, target, action]
+        steps[active] += 1
+        caught[active] = ended & legal
+        illegal[active] = ~legal
+        next_state = next_states[player, target, action]
+        players[active], targets[active] = np.divmod(next_state, num_rooms)
+        active = active[~ended]
+
+    return {
+        'starts': starts,
+        'caught': caught,
+        'illegal': illegal,
+        'steps': steps,
+        'rewards': total_rewards,
+    }
+
+def _evaluate_chunk(args):
+    maze, actions, starts, max_steps = args
+    return _run_episodes(build_model(maze), maze.transitions, actions, starts, max_steps)
+
+def evaluate_policy(maze, actions, num_episodes=None, max_steps=200, num_workers=None, seed=None):
+    """
+    Evaluate a greedy policy headlessly with the same dynamics and rewards
+    as MazeEnv, all the episodes advancing together as array operations.
+
+    Parameters:
+    - maze: Maze the policy plays on
+    - actions: NUM_ROOMS x NUM_ROOMS action table (PolicyTable.actions or a Q-table argmax)
+    - num_episodes: Number of sampled random starts, None evaluates every (start, target) pair
+    - max_steps: Steps after which an episode counts as not caught
+    - num_workers: Split the episodes over this many processes
+    - seed: Seed of the sampled starts
+
+    Returns:
+    - Dict of per-episode arrays: starts, caught, illegal (ended by a move
+      into a wall), steps and rewards
+    """
+    actions = np.asarray(actions)
+    if num_episodes is None:
+        starts = all_pairs(maze.num_rooms)
+    else:
+        starts = sample_starts(maze.num_rooms, num_episodes, np.random.default_rng(seed))
+
+    if not num_workers or num_workers < 2:
+        return _evaluate_chunk((maze, actions, starts, max_steps))
+
+    chunks = np.array_split(starts, num_workers)
+    with mp.get_context().Pool(num_workers) as pool:
+        parts = pool.map(_evaluate_chunk, [(maze, actions, chunk, max_steps) for chunk in chunks])
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+def evaluate_store(store, maze, **kwargs):
+    """
+    Evaluate the policy that the PolicyStore holds for the maze (see
+    evaluate_policy for the keyword arguments). Raises KeyError if the
+    store has no policy for its layout.
+    """
+    policy = store.get(maze)
+    if policy is None:
+        raise KeyError(f"No policy stored for layout {maze.layout_hash()}")
+    return evaluate_policy(maze, policy.actions, **kwargs)
+
+def summarize(results):
+    """
+    Returns:
+    - Dict with the success rate, the steps-to-catch statistics of the caught
+      episodes, the illegal-move rate (illegal moves over all moves) and the mean reward
+    """
+    caught_steps = results['steps'][results['caught']]
+    percentiles = np.percentile(caught_steps, [50, 90, 99]) if len(caught_steps) else [np.nan] * 3
+    return {
+        'episodes': len(results['steps']),
+        'success_rate': float(results['caught'].mean()),
+        'mean_steps_to_catch': float(caught_steps.mean()) if len(caught_steps) else float('nan'),
+        'p50_steps_to_catch': float(percentiles[0]),
+        'p90_steps_to_catch': float(percentiles[1]),
+        'p99_steps_to_catch': float(percentiles[2]),
+        'illegal_move_rate': float(results['illegal'].sum() / results['steps'].sum()),
+        'mean_reward': float(results['rewards'].mean()),
+    }
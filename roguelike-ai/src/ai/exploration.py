@@ -0,0 +1,25 @@
+import numpy as np
+
+def epsilon_greedy(q_values, epsilon, rng=np.random):
+    """
+    Epsilon-greedy action selection for a batch of states with a single
+    RNG call: a draw u < epsilon explores, and u / epsilon is itself uniform
+    in [0, 1), so it also picks the random action.
+
+    Parameters:
+    - q_values: B x actions array of Q-values
+    - epsilon: Exploration rate, a scalar or one per state
+    - rng: NumPy Generator or the np.random module
+
+    Returns:
+    - B actions (int64)
+    """
+    num_states, num_actions = q_values.shape
+    epsilon = np.asarray(epsilon, dtype=np.float64)
+    draws = rng.random(num_states)
+    explore = draws < epsilon
+    random_actions = np.minimum(
+        (np.divide(draws, epsilon, out=np.zeros(num_states), where=explore) * num_actions).astype(np.int64),
+        num_actions - 1
+    )
+    return np.where(explore, random_actions, np.argmax(q_values, axis=1))
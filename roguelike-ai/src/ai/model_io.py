@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+MODEL_FORMAT = "roguelike-q-table"
+POLICY_FORMAT = "roguelike-policy"
+MODEL_FORMAT_VERSION = 1
+
+class ModelMismatchError(ValueError):
+    """Raised when a model was trained on a different maze than the current one."""
+
+def model_paths(filename):
+    """
+    A model is stored as a raw .npy Q-table (memory-mappable) next to a .json header.
+
+    Returns:
+    - (array path, header path) for the given model filename
+    """
+    base, _ = os.path.splitext(filename)
+    return base + '.npy', base + '.json'
+
+def _save(filename, array, maze, format, **extra):
+    array_path, header_path = model_paths(filename)
+    array = np.ascontiguousarray(array)
+    header = {
+        'format': format,
+        'format_version': MODEL_FORMAT_VERSION,
+        'num_rows': maze.num_rows,
+        'num_cols': maze.num_cols,
+        'num_rooms': maze.num_rooms,
+        'layout_hash': maze.layout_hash(),
+        'dtype': array.dtype.str,
+        'shape': list(array.shape),
+    }
+    header.update(extra)
+    np.save(array_path, array)
+    with open(header_path, 'w') as f:
+        json.dump(header, f, indent=2)
+    return array_path, header_path
+
+def save_q_model(filename, q_table, maze, **extra):
+    """
+    Save the Q-table and a header with the maze dimensions, layout hash,
+    dtype and action count.
+
+    Parameters:
+    - filename: Model path (the extension is replaced by .npy/.json)
+    - q_table: NUM_ROOMS x NUM_ROOMS x actions array
+    - maze: Maze the model was trained on
+    - extra: Additional JSON-serializable header fields
+    """
+    return _save(filename, q_table, maze, MODEL_FORMAT, action_count=q_table.shape[-1], **extra)
+
+def model_sha1(filename):
+    """
+    SHA-1 of the Q-table array of a saved model, identifies the exact model
+    a policy was compiled from (raises FileNotFoundError if it is missing).
+    """
+    array_path, _ = model_paths(filename)
+    digest = hashlib.sha1()
+    with open(array_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_policy(filename, actions, maze, action_count, **extra):
+    """
+    Save a compiled NUM_ROOMS x NUM_ROOMS uint8 policy table with the same header as the models.
+    """
+    return _save(filename, actions, maze, POLICY_FORMAT, action_count=action_count, **extra)
+
+def load_header(filename, format=MODEL_FORMAT):
+    _, header_path = model_paths(filename)
+    with open(header_path) as f:
+        header = json.load(f)
+    if header.get('format') != format:
+        raise ValueError(f"{header_path} is not a {format} header")
+    if header['format_version'] > MODEL_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format version {header['format_version']} in {header_path}")
+    return header
+
+def check_layout(header, maze):
+    """
+    Raise ModelMismatchError if the header does not describe the maze.
+    """
+    if (header['num_rows'], header['num_cols']) != (maze.num_rows, maze.num_cols):
+        raise ModelMismatchError(
+            f"Model trained on a {header['num_rows']}x{header['num_cols']} maze, "
+            f"current maze is {maze.num_rows}x{maze.num_cols}"
+        )
+    if header['layout_hash'] != maze.layout_hash():
+        raise ModelMismatchError("Model trained on a different maze layout")
+
+def _load(filename, format, maze, mmap_mode):
+    header = load_header(filename, format)
+    if maze is not None:
+        check_layout(header, maze)
+    array_path, _ = model_paths(filename)
+    array = np.load(array_path, mmap_mode=mmap_mode)
+    if array.dtype.str != header['dtype'] or list(array.shape) != header['shape']:
+        raise ValueError(f"{array_path} does not match its header")
+    return array, header
+
+def load_q_model(filename, maze=None, mmap_mode='r'):
+    """
+    Load a Q-table saved by save_q_model.
+
+    Parameters:
+    - filename: Model path
+    - maze: If given, refuse (ModelMismatchError) a model trained on another maze
+    - mmap_mode: np.load memory-map mode, 'r' maps the table read-only
+      without reading it, None loads it in memory
+
+    Returns:
+    - (q_table, header)
+    """
+    return _load(filename, MODEL_FORMAT, maze, mmap_mode)
+
+def load_policy(filename, maze=None, mmap_mode='r'):
+    """
+    Load a policy table saved by save_policy.
+
+    Returns:
+    - (actions, header)
+    """
+    return _load(filename, POLICY_FORMAT, maze, mmap_mode)
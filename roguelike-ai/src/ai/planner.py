@@ -0,0 +1,68 @@
+import numpy as np
+from src.ai.rewards import shaped_rewards
+
+def build_model(maze):
+    """
+    Build the joint transition and reward arrays of MazeEnv for every
+    (player_room, target_room) state and action, from the maze tables and
+    the deterministic chaser of MazeEnv._move_player2.
+
+    Returns:
+    - next_states: NUM_ROOMS x NUM_ROOMS x 4 flat index (player * NUM_ROOMS + target) of the next state
+    - rewards: NUM_ROOMS x NUM_ROOMS x 4 reward of each transition
+    - terminal: NUM_ROOMS x NUM_ROOMS x 4 True where the transition ends the
+      episode (player caught or move into a wall)
+    """
+    num_rooms = maze.num_rooms
+    player = np.arange(num_rooms)[:, None, None]
+    target = np.arange(num_rooms)[None, :, None]
+
+    # Player1 move, moves into a wall leave the state unchanged
+    next_player = maze.transitions[:, None, :]
+    legal = np.broadcast_to(next_player >= 0, (num_rooms, num_rooms, maze.transitions.shape[1]))
+    next_player = np.where(legal, next_player, player)
+
+    # Player2 moves one room along the shortest path to player1 (stays if there is none)
+    next_target = maze.next_hop[target, next_player].astype(np.int64)
+    next_target = np.where(legal & (next_target >= 0), next_target, target)
+
+    # Same shaping as MazeEnv._get_reward
+    previous_distance = maze.distance[player, target]
+    current_distance = maze.distance[next_player, next_target]
+    caught = legal & (next_player == next_target)
+    rewards = shaped_rewards(previous_distance, current_distance, caught, legal)
+
+    next_states = next_player * num_rooms + next_target
+    terminal = caught | ~legal
+    return next_states, rewards, terminal
+
+def solve_q_table(maze, discount_factor=0.99, tol=1e-6, max_iterations=10000):
+    """
+    Solve the Q-table of the maze with vectorized Q-iteration.
+
+    Parameters:
+    - maze: Maze with transition, distance and next-hop tables
+    - discount_factor: How much future rewards are valued
+    - tol: Stop when no Q-value changes by more than this
+    - max_iterations: Upper bound on the number of sweeps
+
+    Returns:
+    - q_table: NUM_ROOMS x NUM_ROOMS x 4 array, in the layout used by QLearningAgent
+    - iterations: Number of sweeps performed
+    """
+    next_states, rewards, terminal = build_model(maze)
+    continuing = discount_factor * ~terminal
+    q_table = np.zeros(rewards.shape)
+
+    for iteration in range(1, max_iterations + 1):
+        values = q_table.max(axis=-1).ravel()
+        new_q_table = rewards + continuing * values[next_states]
+        delta = np.max(np.abs(new_q_table - q_table))
+        q_table = new_q_table
+        if delta < tol:
+            break
+
+    # States with both players in the same room are never visited
+    same_room = np.arange(maze.num_rooms)
+    q_table[same_room, same_room] = 0
+    return q_table, iteration
@@ -0,0 +1,38 @@
+import numpy as np
+
+# Reward shaping of the chase, the single definition used by MazeEnv,
+# VecMazeEnv and the planner (hence the solver and the evaluation engine)
+CLOSER_REWARD = 1.0    # the move reduced the distance to the target
+CATCH_REWARD = 5.0     # the player reached the target's room
+TIME_PENALTY = 0.1     # every move
+IDLE_PENALTY = 0.2     # room moves are instantaneous, so the player always reports idle
+WALL_PENALTY = -5.0    # move into a wall, replaces the whole reward
+
+def shaped_reward(previous_distance, current_distance, caught):
+    """
+    Reward of a single legal move (plain Python, for MazeEnv.step).
+
+    Parameters:
+    - previous_distance: Distance between the players before the move
+    - current_distance: Distance between the players after the move
+    - caught: True if the move ends in the target's room
+    """
+    reward = 0.0
+    if current_distance < previous_distance:
+        reward += CLOSER_REWARD
+    if caught:
+        reward += CATCH_REWARD
+    return reward - TIME_PENALTY - IDLE_PENALTY
+
+def shaped_rewards(previous_distance, current_distance, caught, legal=True):
+    """
+    Element-wise shaped_reward over arrays of moves, with WALL_PENALTY
+    where legal is False.
+
+    Returns:
+    - float64 array of rewards
+    """
+    rewards = CLOSER_REWARD * (np.asarray(current_distance) < previous_distance)
+    rewards = rewards + CATCH_REWARD * np.asarray(caught)
+    rewards = rewards - TIME_PENALTY - IDLE_PENALTY
+    return np.where(legal, rewards, WALL_PENALTY)
@@ -0,0 +1,138 @@
+import queue
+import numpy as np
+from multiprocessing import shared_memory
+
+class SharedQTable:
+    """
+    Q-table and exploration rate published by the learner to the rollout
+    workers through shared memory. Workers only copy it when the version
+    counter changes.
+    """
+    def __init__(self, ctx, q_table, epsilon):
+        self.shape = q_table.shape
+        self.dtype = q_table.dtype.str
+        self.shm = shared_memory.SharedMemory(create=True, size=q_table.nbytes)
+        self.lock = ctx.Lock()
+        self.version = ctx.Value('i', 0, lock=False)
+        self.epsilon = ctx.Value('d', epsilon, lock=False)
+        self.publish(q_table, epsilon)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Workers attach to the segment by name instead of pickling the handle
+        state['shm'] = self.shm.name
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.shm = shared_memory.SharedMemory(name=state['shm'])
+
+    def _array(self):
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    def publish(self, q_table, epsilon):
+        with self.lock:
+            self._array()[...] = q_table
+            self.epsilon.value = epsilon
+            self.version.value += 1
+
+    def read(self):
+        """
+        Returns:
+        - (version, copy of the Q-table, epsilon)
+        """
+        with self.lock:
+            return self.version.value, self._array().copy(), self.epsilon.value
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+def _new_batch(batch_size):
+    return {
+        'states': np.zeros((batch_size, 2), dtype=np.int16),
+        'actions': np.zeros(batch_size, dtype=np.uint8),
+        'rewards': np.zeros(batch_size, dtype=np.float32),
+        'next_states': np.zeros((batch_size, 2), dtype=np.int16),
+        'dones': np.zeros(batch_size, dtype=bool),
+        'episode_rewards': []
+    }
+
+def _put(transition_queue, batch, stop_event):
+    # Do not block forever on a full queue once the learner asked to stop
+    while not stop_event.is_set():
+        try:
+            transition_queue.put(batch, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+def rollout_worker(seed, shared_q, transition_queue, stop_event, batch_size=1024,
+                   max_steps_per_episode=200, maze_bytes=None):
+    """
+    Collect epsilon-greedy episodes on a private MazeEnv and stream the
+    transitions to the learner in NumPy batches of batch_size.
+
+    Parameters:
+    - seed: Seed of the worker's environment
+    - shared_q: SharedQTable the learner publishes to
+    - transition_queue: Queue receiving the transition batches
+    - stop_event: Set by the learner when training is over
+    - batch_size: Transitions per batch
+    - max_steps_per_episode: Maximum steps in each episode
+    - maze_bytes: Learner's maze (Maze.to_bytes), so that every worker steps
+      the layout the Q-table is trained and saved for
+    """
+    # Imported here so that the parent only pays for it in the workers
+    from src.ai.MazeEnv import MazeEnv
+    from src.world.Maze import Maze
+
+    env = MazeEnv(max_episode_steps=max_steps_per_episode)
+    if maze_bytes is not None:
+        env.sim.maze = Maze.from_bytes(maze_bytes)
+    env.reset(seed=seed)
+    rng = env.np_random
+    version, q_table, epsilon = shared_q.read()
+    num_rooms = q_table.shape[0]
+
+    batch = _new_batch(batch_size)
+    size = 0
+
+    while not stop_event.is_set():
+        state, _ = env.reset()
+        state = np.clip(state, 0, num_rooms - 1)
+        total_episode_reward = 0
+
+        for step in range(max_steps_per_episode):
+            # Action selection (exploration vs exploitation)
+            if rng.random() < epsilon:
+                action = int(rng.integers(q_table.shape[-1]))
+            else:
+                action = int(np.argmax(q_table[state[0], state[1]]))
+
+            next_state, reward, done, truncated, info = env.step(action)
+            next_state = np.clip(next_state, 0, num_rooms - 1)
+
+            batch['states'][size] = state
+            batch['actions'][size] = action
+            batch['rewards'][size] = reward
+            batch['next_states'][size] = next_state
+            batch['dones'][size] = done
+            size += 1
+            total_episode_reward += reward
+            state = next_state
+
+            if size == batch_size:
+                _put(transition_queue, batch, stop_event)
+                batch = _new_batch(batch_size)
+                size = 0
+
+            if done or truncated:
+                break
+
+        batch['episode_rewards'].append(total_episode_reward)
+
+        # Pick up the latest Q-table broadcast by the learner
+        if shared_q.version.value != version:
+            version, q_table, epsilon = shared_q.read()
@@ -1,14 +1,17 @@
 import pygame as pg
 import numpy as np
-import networkx as nx
 from config import load_config
 from src.world.Room import Room
 from src.core.Player import Player
 from src.world.generator import MazeGenerator
+from src.world.Maze import DIRECTIONS
+from src.utils.logger import get_logger
 import math
 
+logger = get_logger(__name__)
+
 class MazeGame:
-    def __init__(self):
+    def __init__(self, maze=None):
         pg.init()
         self.starting_time = pg.time.get_ticks()
         self.config = load_config()
@@ -25,22 +28,34 @@ class MazeGame:
         self.screen = pg.display.set_mode((self.WIDTH, self.HEIGHT), pg.RESIZABLE)
         pg.display.set_caption(self.config['display']['caption'])
         
-        self.maze_generator = MazeGenerator(self.NUM_ROWS, self.NUM_COLS)
-        self.graph = self.maze_generator.generate_grid_graph(self.NUM_ROWS, self.NUM_COLS)
-        self.rooms = self._create_rooms()
+        self.maze_generator = MazeGenerator.from_config(self.config)
+        # An already generated maze can be passed in, e.g. by MazeEnv when rendering its simulation
+        if maze is None:
+            maze = self.maze_generator.generate_maze()
         self.size = self.NUM_ROOMS * self.ROOM_SIZE
         #print(self.maze_generator.get_neighbors(11))
-        # Configure doors for each room based on the maze graph
-        self._setup_room_doors()
+        self.set_maze(maze)
         player1_room, player2_room = np.random.choice(np.arange(0, self.NUM_ROOMS ), size=2, replace=False)
         self.player1 = Player(self.ROOM_SIZE, self.NUM_ROOMS, self.config, 'blue', player1_room)
         self.player2 = Player(self.ROOM_SIZE, self.NUM_ROOMS, self.config, 'red', player2_room)
-        self.previous_distance_room = nx.shortest_path_length(self.graph, self.player1.current_room, self.player2.current_room)
+        self.previous_distance_room = self.maze.shortest_path_length(self.player1.current_room, self.player2.current_room)
         self.previous_distance = 10000
         self.last_move_time = 0
         self.move_delay = 200  # Millisecondi tra i movimenti
         self.unauthorized_movement = False
 
+    def set_maze(self, maze):
+        """Replace the maze and rebuild the rooms and their doors."""
+        self.maze = maze
+        self.rooms = self._create_rooms()
+        # Configure doors for each room based on the maze walls
+        self._setup_room_doors()
+
+    @property
+    def graph(self):
+        """networkx view of the maze, built on first use."""
+        return self.maze.graph
+
     def _create_rooms(self):
         tile_size = self.config['tile_size']
         return [Room(c * self.ROOM_SIZE,
@@ -52,9 +67,9 @@ class MazeGame:
                 for c in range(self.NUM_COLS)]
 
     def _setup_room_doors(self):
-        """Configure doors for each room based on the maze graph."""
+        """Configure doors for each room based on the maze walls."""
         for room in self.rooms:
-            room.setup_doors(self.NUM_COLS, self.NUM_ROWS, list(self.graph.neighbors(room.room_number)))
+            room.setup_doors(self.NUM_COLS, self.NUM_ROWS, walls=int(self.maze.walls[room.room_number]))
 
     def handle_input(self):
         current_time = pg.time.get_ticks()
@@ -78,11 +93,6 @@ class MazeGame:
         moved |= moved_p1
         unauthorized_movement |= unauthorized_p1  # OR per mantenere il flag
 
-        # Check unauthorized movement for Player 1
-        available_moves_p1 = list(self.graph.neighbors(self.player1.current_room))
-        # if not self.check_unauthorized_movement(self.player1, available_moves_p1):
-        #     unauthorized_movement = True
-
         # Player 2 movement (WASD KEYS)
         moved_p2, unauthorized_p2 = self._handle_player_movement(
             self.player2, 
@@ -96,11 +106,6 @@ class MazeGame:
         moved |= moved_p2
         unauthorized_movement |= unauthorized_p2  # OR per mantenere il flag
 
-        # Check unauthorized movement for Player 2
-        available_moves_p2 = list(self.graph.neighbors(self.player2.current_room))
-        # if not self.check_unauthorized_movement(self.player2, available_moves_p2):
-        #     unauthorized_movement = True
-
         if moved:
             self.last_move_time = current_time
         
@@ -119,33 +124,15 @@ class MazeGame:
             tuple: (bool: movement occurred, bool: unauthorized movement detected)
         """
         keys = pg.key.get_pressed()
-        available_moves = list(self.graph.neighbors(player.current_room))
         moved = False
         unauthorized_movement = False
 
-        # Up movement
-        if keys[key_map['UP']]:
-            self._move_player_between_rooms(player, "UP")
-            moved = True
-        
-        # Down movement
-        if keys[key_map['DOWN']]:
-            self._move_player_between_rooms(player, "DOWN")
-            moved = True
-        
-        # Left movement
-        if keys[key_map['LEFT']]:
-            self._move_player_between_rooms(player, "LEFT")
-            moved = True
-        
-        # Right movement
-        if keys[key_map['RIGHT']]:
-            self._move_player_between_rooms(player, "RIGHT")
-            moved = True
-
-        # Check unauthorized movement
-        # if self.check_unauthorized_movement(player, available_moves):
-        #     unauthorized_movement = True
+        for direction in DIRECTIONS:
+            if keys[key_map[direction]]:
+                if self._move_player_between_rooms(player, direction):
+                    moved = True
+                else:
+                    unauthorized_movement = True
 
         return moved, unauthorized_movement
 
@@ -165,32 +152,21 @@ class MazeGame:
 
     def _move_player_between_rooms(self, player, direction):
         """
-        Move player between rooms based on the graph's connections.
+        Move player between rooms based on the maze transition table.
         
         Args:
             player (Player): The player to move
             direction (str): Direction of movement
+
+        Returns:
+            bool: True if the move was authorized, False if it hit a wall
         """
-        current_room = self.rooms[player.current_room]
-        
         # Determine target room based on direction
-        if direction == "UP":
-            target_room = player.current_room - self.NUM_COLS
-        elif direction == "DOWN":
-            target_room = player.current_room + self.NUM_COLS
-        elif direction == "LEFT":
-            target_room = player.current_room - 1
-        elif direction == "RIGHT":
-            target_room = player.current_room + 1
-        print(self.graph)
+        target_room = self.maze.target_room(player.current_room, DIRECTIONS.index(direction))
+        logger.debug("%s player %s: room %d -> %d", player.player_color, direction, player.current_room, target_room)
         # Validate target room index
-        if target_room not in self.maze_generator.get_neighbors(player.current_room):
-            return  # Prevent moving to an invalid room
-        if target_room in self.graph.neighbors(player.current_room):
-            print("authorized")
-        else:
-            print("Unauthorized")
-              
+        if target_room < 0:
+            return False  # Prevent moving through a wall
         
         # Update player's room and grid position
         player.current_room = target_room
@@ -208,6 +184,8 @@ class MazeGame:
         # self.check_last_move_authorization() 
         # Mark that the room has changed
         player.room_changed = True
+        return True
+
     def draw(self):
         self.screen.fill(self.COLORS['white'])
         for room in self.rooms:
@@ -268,7 +246,7 @@ class MazeGame:
                 self.previous_distance = distanza_attuale
                 return False
         else:
-            distanza_attuale = nx.shortest_path_length(self.graph, self.player1.current_room, self.player2.current_room)
+            distanza_attuale = self.maze.shortest_path_length(self.player1.current_room, self.player2.current_room)
             if distanza_attuale < self.previous_distance:
                 self.previous_distance = distanza_attuale
                 return True
@@ -307,7 +285,7 @@ class MazeGame:
     def run(self):
         running = True
         clock = pg.time.Clock()
-        print(self.player1.check_unauthorized_movement(list(self.graph.neighbors(self.player1.current_room))))
+        logger.debug("player 1 unauthorized: %s", self.player1.check_unauthorized_movement(self.maze.neighbors(self.player1.current_room).tolist()))
         
         while running:
             dt = clock.tick(60)  # Delta time in milliseconds
@@ -331,18 +309,18 @@ class MazeGame:
 
             ret = self.player_changing_room()
             if ret[0]:
-                print("player 1 ha cambiato stanza")
+                logger.debug("player 1 ha cambiato stanza")
             if ret[1]:
-                print("player 2 ha cambiato stanza")
+                logger.debug("player 2 ha cambiato stanza")
             for event in pg.event.get():
                 if event.type == pg.QUIT:
                     running = False
 
             if self.check_collision_between_player():
-                print("game won")
+                logger.info("game won")
                 running = False
             if self.timer(1):
-                print("game lost")
+                logger.info("game lost")
                 running = False 
 
             self.handle_input()
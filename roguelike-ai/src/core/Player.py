@@ -1,6 +1,9 @@
 import pygame as pg
 import numpy as np
 from typing import List, Dict
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class Player:
     def __init__(self, room_size: int, num_rooms: int, config: Dict, player_color: str, spawn_room: int):
@@ -37,7 +40,7 @@ class Player:
         Track an unauthorized move for the player.
         """
         
-        print(f"Unauthorized move detected for player in room {self.current_room}")
+        logger.debug("Unauthorized move detected for player in room %d", self.current_room)
 
     def draw(self, surface, num_cols: int, colors: Dict):
         room_row = self.current_room // num_cols
@@ -159,10 +162,9 @@ class Player:
                 self.pos[1] = start_y + (self.grid_y - self.target_pos[1]) * self.tile_size * (self.move_progress/100)
 
     def check_last_move_authorization(self, available_moves):
-        print(self)
-        print(available_moves)
+        logger.debug("%s available moves: %s", self, available_moves)
         if self.check_unauthorized_movement(available_moves):
-            print(f"Player {self.player_color} in room {self.current_room} made an unauthorized move.") 
+            logger.debug("Player %s in room %d made an unauthorized move.", self.player_color, self.current_room)
 
     def check_unauthorized_movement(self, available_moves):
         """
@@ -0,0 +1,75 @@
+import numpy as np
+from config import load_config
+from src.world.generator import MazeGenerator
+
+class MazeSimulation:
+    """
+    Headless core of the maze game: maze, player rooms, collision and
+    episode step clock. It never imports pygame, so it can run on display-less
+    training workers; MazeGame is only needed to draw it.
+    """
+    def __init__(self, config=None, rng=None, maze_pool=None, seed=None):
+        """
+        Parameters:
+        - config: Configuration dict (loaded from config.yaml if None)
+        - rng: numpy Generator used to sample the spawn rooms and the regenerated mazes
+        - maze_pool: MazePool to sample the mazes from instead of generating them
+        - seed: Seed of the first maze (defaults to maze.seed in config.yaml), so that
+          every process building the same configuration starts on the same layout
+        """
+        self.config = config if config is not None else load_config()
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.NUM_ROWS = self.config['maze']['min_rows']
+        self.NUM_COLS = self.config['maze']['min_cols']
+        self.NUM_ROOMS = self.NUM_ROWS * self.NUM_COLS
+
+        self.maze_pool = maze_pool
+        if maze_pool is not None and (maze_pool.num_rows, maze_pool.num_cols) != (self.NUM_ROWS, self.NUM_COLS):
+            raise ValueError(
+                f"Maze pool is {maze_pool.num_rows}x{maze_pool.num_cols}, "
+                f"the simulation is {self.NUM_ROWS}x{self.NUM_COLS}"
+            )
+        self.maze_generator = MazeGenerator.from_config(self.config, seed=seed)
+        self.regenerate(self.maze_generator.rng)
+        self.reset()
+
+    def regenerate(self, rng=None):
+        """
+        Generate a new maze (walls and path tables), or sample one from the
+        maze pool. Players are not respawned.
+
+        Parameters:
+        - rng: numpy Generator of the new maze (defaults to the simulation's)
+        """
+        rng = rng if rng is not None else self.rng
+        if self.maze_pool is not None:
+            self.maze = self.maze_pool.sample(rng)
+        else:
+            self.maze = self.maze_generator.generate_maze(rng)
+
+    @property
+    def graph(self):
+        """networkx view of the maze, built on first use."""
+        return self.maze.graph
+
+    def reset(self):
+        """
+        Respawn both players in two distinct random rooms and zero the episode step clock.
+        The maze, its rooms and its tables are kept.
+        """
+        player1_room, player2_room = self.rng.choice(self.NUM_ROOMS, size=2, replace=False)
+        self.player1_room = int(player1_room)
+        self.player2_room = int(player2_room)
+        self.previous_distance_room = self.maze.shortest_path_length(self.player1_room, self.player2_room)
+        self.steps = 0
+
+    def check_collision_between_player(self):
+        # Headless players always stand in the middle of their room
+        return self.player1_room == self.player2_room
+
+    def tick(self):
+        """Advance the episode clock by one step."""
+        self.steps += 1
+
+    def out_of_steps(self, max_steps):
+        return self.steps >= max_steps
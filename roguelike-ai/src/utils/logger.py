@@ -0,0 +1,122 @@
+import logging
+import time
+from typing import Dict, Optional
+
+ROOT_LOGGER = "roguelike"
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+def setup_logging(config: Optional[Dict] = None, level=None) -> logging.Logger:
+    """
+    Configure the package loggers once, from the 'logging' section of the config.
+    Only entry points (main, runAIEnv, server) should call this.
+
+    Args:
+        config (dict): Configuration with an optional logging.level / logging.format
+        level (str|int): Overrides the configured level
+
+    Returns:
+        logging.Logger: The package root logger
+    """
+    settings = (config or {}).get('logging', {})
+    level = level if level is not None else settings.get('level', 'INFO')
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(settings.get('format', LOG_FORMAT)))
+        root.addHandler(handler)
+        root.propagate = False
+    return root
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Per-module logger under the package root, e.g. get_logger(__name__).
+    """
+    if name != ROOT_LOGGER and not name.startswith(ROOT_LOGGER + "."):
+        name = f"{ROOT_LOGGER}.{name}"
+    return logging.getLogger(name)
+
+class SampledLogger:
+    """
+    Logger for hot loops that only emits every Nth call and/or at most once
+    per interval seconds. When the level is disabled a call costs a single
+    isEnabledFor check, so the message is never formatted.
+    """
+    def __init__(self, logger: logging.Logger, every: int = 1, interval: Optional[float] = None):
+        self.logger = logger
+        self.every = max(1, every)
+        self.interval = interval
+        self._calls = 0
+        self._last_emit = float('-inf')
+
+    def log(self, level: int, msg: str, *args) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        self._calls += 1
+        if self._calls % self.every:
+            return
+        if self.interval is not None:
+            now = time.monotonic()
+            if now - self._last_emit < self.interval:
+                return
+            self._last_emit = now
+        self.logger.log(level, msg, *args)
+
+    def debug(self, msg: str, *args) -> None:
+        self.log(logging.DEBUG, msg, *args)
+
+    def info(self, msg: str, *args) -> None:
+        self.log(logging.INFO, msg, *args)
+
+class MetricsAggregator:
+    """
+    Accumulates numeric metrics and logs one summary line (count, mean, min,
+    max per metric) every `every` records instead of a line per record.
+    """
+    def __init__(self, logger: logging.Logger, every: int = 100, level: int = logging.INFO,
+                 prefix: str = "metrics"):
+        self.logger = logger
+        self.every = max(1, every)
+        self.level = level
+        self.prefix = prefix
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self._sums: Dict[str, float] = {}
+        self._mins: Dict[str, float] = {}
+        self._maxs: Dict[str, float] = {}
+
+    def record(self, **metrics: float) -> Optional[Dict[str, float]]:
+        """
+        Add one sample of each metric.
+
+        Returns:
+            dict: Mean of each metric when a summary was emitted, None otherwise
+        """
+        self.count += 1
+        for key, value in metrics.items():
+            self._sums[key] = self._sums.get(key, 0.0) + value
+            self._mins[key] = min(self._mins.get(key, value), value)
+            self._maxs[key] = max(self._maxs.get(key, value), value)
+        if self.count >= self.every:
+            return self.flush()
+        return None
+
+    def summary(self) -> Dict[str, float]:
+        return {key: total / self.count for key, total in self._sums.items()} if self.count else {}
+
+    def flush(self) -> Dict[str, float]:
+        """Log the summary of the pending samples and start a new window."""
+        means = self.summary()
+        if means and self.logger.isEnabledFor(self.level):
+            parts = ", ".join(
+                f"{key}={means[key]:.3f} [{self._mins[key]:.3f}, {self._maxs[key]:.3f}]"
+                for key in means
+            )
+            self.logger.log(self.level, "%s over %d: %s", self.prefix, self.count, parts)
+        self.reset()
+        return means
@@ -0,0 +1,179 @@
+import hashlib
+import numpy as np
+
+# Action index -> direction, shared by every component that moves a player
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+UP, DOWN, LEFT, RIGHT = range(len(DIRECTIONS))
+# Wall bit of each direction in Maze.walls, a set bit closes that side of the room
+WALL_UP, WALL_DOWN, WALL_LEFT, WALL_RIGHT = (1 << action for action in range(len(DIRECTIONS)))
+ALL_WALLS = WALL_UP | WALL_DOWN | WALL_LEFT | WALL_RIGHT
+
+class Maze:
+    """
+    A generated maze: one uint8 per room with a wall bit per direction, plus
+    the tables compiled once from it. Moves, wall checks, distance and chase
+    queries are all O(1) array lookups instead of graph queries or a BFS on
+    every step. The all-pairs path tables and the networkx graph are only
+    built on first use, so very large mazes cost a few bytes per room.
+    """
+    def __init__(self, walls, num_rows: int, num_cols: int):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.num_rooms = num_rows * num_cols
+        self.walls = np.asarray(walls, dtype=np.uint8).reshape(self.num_rooms)
+        self.transitions = self._compile_transitions()
+        self._distance = None
+        self._next_hop = None
+        self._graph = None
+        self._layout_hash = None
+
+    @classmethod
+    def from_tables(cls, walls, num_rows: int, num_cols: int, transitions, distance, next_hop) -> "Maze":
+        """Maze over already compiled tables (e.g. mapped from a MazePool), nothing is recomputed."""
+        maze = cls.__new__(cls)
+        maze.num_rows = num_rows
+        maze.num_cols = num_cols
+        maze.num_rooms = num_rows * num_cols
+        maze.walls = walls
+        maze.transitions = transitions
+        maze._distance = distance
+        maze._next_hop = next_hop
+        maze._graph = None
+        maze._layout_hash = None
+        return maze
+
+    @classmethod
+    def from_graph(cls, graph, num_rows: int, num_cols: int) -> "Maze":
+        """Build the maze of a room graph whose edges are doors between adjacent rooms."""
+        walls = np.full(num_rows * num_cols, ALL_WALLS, dtype=np.uint8)
+        for room, neighbor in graph.edges():
+            room, neighbor = min(room, neighbor), max(room, neighbor)
+            if room // num_cols == neighbor // num_cols:
+                walls[room] &= ALL_WALLS ^ WALL_RIGHT
+                walls[neighbor] &= ALL_WALLS ^ WALL_LEFT
+            else:
+                walls[room] &= ALL_WALLS ^ WALL_DOWN
+                walls[neighbor] &= ALL_WALLS ^ WALL_UP
+        return cls(walls, num_rows, num_cols)
+
+    def to_bytes(self) -> bytes:
+        """Dimensions (two little-endian int32) followed by the wall bytes."""
+        return np.array([self.num_rows, self.num_cols], dtype='<i4').tobytes() + self.walls.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Maze":
+        num_rows, num_cols = np.frombuffer(data, dtype='<i4', count=2)
+        walls = np.frombuffer(data, dtype=np.uint8, offset=8, count=int(num_rows) * int(num_cols))
+        return cls(walls.copy(), int(num_rows), int(num_cols))
+
+    @property
+    def graph(self):
+        """networkx view of the maze for tooling, built on first access."""
+        if self._graph is None:
+            import networkx as nx
+            graph = nx.Graph()
+            graph.add_nodes_from(range(self.num_rooms))
+            rooms = np.arange(self.num_rooms)
+            for action in (DOWN, RIGHT):
+                doors = self.transitions[:, action] >= 0
+                graph.add_edges_from(zip(rooms[doors].tolist(), self.transitions[doors, action].tolist()))
+            self._graph = graph
+        return self._graph
+
+    @property
+    def distance(self) -> np.ndarray:
+        if self._distance is None:
+            self._distance, self._next_hop = self._compute_path_tables()
+        return self._distance
+
+    @property
+    def next_hop(self) -> np.ndarray:
+        if self._next_hop is None:
+            self._distance, self._next_hop = self._compute_path_tables()
+        return self._next_hop
+
+    def _compile_transitions(self):
+        """
+        Returns:
+        - transitions: NUM_ROOMS x 4 int32 room reached from each room moving
+          UP, DOWN, LEFT, RIGHT (-1 for walls)
+        """
+        rooms = np.arange(self.num_rooms, dtype=np.int32)
+        offsets = np.array([-self.num_cols, self.num_cols, -1, 1], dtype=np.int32)
+        bits = np.array([WALL_UP, WALL_DOWN, WALL_LEFT, WALL_RIGHT], dtype=np.uint8)
+        open_sides = (self.walls[:, None] & bits) == 0
+        return np.where(open_sides, rooms[:, None] + offsets, -1).astype(np.int32)
+
+    def _compute_path_tables(self):
+        """
+        Compute the all-pairs tables with one BFS per room.
+
+        Returns:
+        - distance: NUM_ROOMS x NUM_ROOMS int16 shortest path length (-1 if unreachable)
+        - next_hop: NUM_ROOMS x NUM_ROOMS int16 room following the first one on a
+          shortest path to the second one (-1 if unreachable)
+        """
+        distance = np.full((self.num_rooms, self.num_rooms), -1, dtype=np.int16)
+        next_hop = np.full((self.num_rooms, self.num_rooms), -1, dtype=np.int16)
+        adjacency = [[int(room) for room in row if room >= 0] for row in self.transitions]
+
+        for target in range(self.num_rooms):
+            # BFS from the target, the parent of each room is its next hop towards it
+            dist_row = [-1] * self.num_rooms
+            hop_row = [-1] * self.num_rooms
+            dist_row[target] = 0
+            hop_row[target] = target
+            frontier = [target]
+            while frontier:
+                next_frontier = []
+                for room in frontier:
+                    for neighbor in adjacency[room]:
+                        if dist_row[neighbor] < 0:
+                            dist_row[neighbor] = dist_row[room] + 1
+                            hop_row[neighbor] = room
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+            distance[:, target] = dist_row
+            next_hop[:, target] = hop_row
+
+        return distance, next_hop
+
+    def layout_hash(self) -> str:
+        """
+        Canonical hash of the layout (dimensions and doors of every room), used
+        to check that a model was trained on this maze and to index policies.
+        Computed once, the tables are never modified after construction.
+        """
+        if self._layout_hash is None:
+            digest = hashlib.sha1()
+            digest.update(np.array([self.num_rows, self.num_cols], dtype='<i4').tobytes())
+            digest.update(self.transitions.astype('<i4').tobytes())
+            self._layout_hash = digest.hexdigest()
+        return self._layout_hash
+
+    def target_room(self, room: int, action: int) -> int:
+        """Room reached moving from room in the action's direction (-1 if there is a wall)."""
+        return int(self.transitions[room, action])
+
+    def is_valid_move(self, room: int, action: int) -> bool:
+        return bool(self.transitions[room, action] >= 0)
+
+    def has_wall(self, room: int, action: int) -> bool:
+        return bool(self.walls[room] & (1 << action))
+
+    def neighbors(self, room: int) -> np.ndarray:
+        """Rooms reachable from room in one move."""
+        row = self.transitions[room]
+        return row[row >= 0]
+
+    def action_mask(self, room: int) -> np.ndarray:
+        """Boolean mask of the actions that do not hit a wall from room."""
+        return self.transitions[room] >= 0
+
+    def shortest_path_length(self, source: int, target: int) -> int:
+        """Number of moves between two rooms (-1 if they are not connected)."""
+        return int(self.distance[source, target])
+
+    def next_room(self, source: int, target: int) -> int:
+        """Room to move into from source to get closer to target (-1 if unreachable)."""
+        return int(self.next_hop[source, target])
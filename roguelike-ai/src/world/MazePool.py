@@ -0,0 +1,149 @@
+import argparse
+import multiprocessing as mp
+import os
+import numpy as np
+from src.world.Maze import Maze, DIRECTIONS
+from src.world.generator import MazeGenerator, ALGORITHMS
+
+POOL_MAGIC = b"RLMZPOOL"
+POOL_VERSION = 1
+HEADER_SIZE = 64
+ALIGNMENT = 64
+
+def _sections(num_mazes, num_rooms):
+    """
+    (name, dtype, shape, offset) of each table in the pool file, in file order.
+    """
+    sections = []
+    offset = HEADER_SIZE
+    for name, dtype, shape in (
+        ('walls', np.uint8, (num_mazes, num_rooms)),
+        ('transitions', np.dtype('<i4'), (num_mazes, num_rooms, len(DIRECTIONS))),
+        ('distance', np.dtype('<i2'), (num_mazes, num_rooms, num_rooms)),
+        ('next_hop', np.dtype('<i2'), (num_mazes, num_rooms, num_rooms)),
+    ):
+        sections.append((name, np.dtype(dtype), shape, offset))
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += -(-size // ALIGNMENT) * ALIGNMENT
+    return sections, offset
+
+def _open_tables(filename, num_mazes, num_rooms, mode):
+    sections, _ = _sections(num_mazes, num_rooms)
+    return {
+        name: np.memmap(filename, dtype=dtype, mode=mode, offset=offset, shape=shape)
+        for name, dtype, shape, offset in sections
+    }
+
+def _build_chunk(args):
+    filename, start, stop, seed, num_mazes, num_rows, num_cols, algorithm, loop_density = args
+    generator = MazeGenerator(num_rows, num_cols, algorithm=algorithm, loop_density=loop_density)
+    rng = np.random.default_rng(seed)
+    tables = _open_tables(filename, num_mazes, num_rows * num_cols, 'r+')
+    for index in range(start, stop):
+        maze = generator.generate_maze(rng)
+        tables['walls'][index] = maze.walls
+        tables['transitions'][index] = maze.transitions
+        tables['distance'][index] = maze.distance
+        tables['next_hop'][index] = maze.next_hop
+    for table in tables.values():
+        table.flush()
+
+class MazePool:
+    """
+    Read-only archive of K pre-generated mazes with their compiled
+    transition, distance and next-hop tables, stored in one file:
+    a 64-byte header followed by one aligned section per table. The
+    sections are memory-mapped, so every process opening the same file
+    shares it through the page cache and a maze is a view, not a copy.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if header[:len(POOL_MAGIC)] != POOL_MAGIC:
+            raise ValueError(f"{filename} is not a maze pool")
+        version, num_mazes, num_rows, num_cols = np.frombuffer(header, dtype='<i4', count=4, offset=8)
+        if version > POOL_VERSION:
+            raise ValueError(f"Unsupported maze pool version {version} in {filename}")
+        self.num_mazes = int(num_mazes)
+        self.num_rows = int(num_rows)
+        self.num_cols = int(num_cols)
+        self.num_rooms = self.num_rows * self.num_cols
+        self.tables = _open_tables(filename, self.num_mazes, self.num_rooms, 'r')
+
+    def __getstate__(self):
+        # Worker processes reopen the file instead of pickling the tables
+        return {'filename': self.filename}
+
+    def __setstate__(self, state):
+        self.__init__(state['filename'])
+
+    def __len__(self):
+        return self.num_mazes
+
+    def maze(self, index):
+        """Maze at index, backed by the mapped tables (nothing is recomputed)."""
+        return Maze.from_tables(
+            self.tables['walls'][index], self.num_rows, self.num_cols,
+            self.tables['transitions'][index], self.tables['distance'][index], self.tables['next_hop'][index]
+        )
+
+    def sample(self, rng):
+        """A uniformly random maze of the pool."""
+        return self.maze(int(rng.integers(self.num_mazes)))
+
+    @classmethod
+    def build(cls, filename, num_mazes, num_rows, num_cols, algorithm="eller", loop_density=0.0,
+              seed=None, num_workers=None):
+        """
+        Generate num_mazes mazes into a new pool file, splitting the work
+        over num_workers processes that write disjoint parts of the file.
+
+        Parameters:
+        - filename: Pool file to create (overwritten if it exists)
+        - num_mazes: Number of mazes K
+        - num_rows, num_cols: Dimensions of every maze
+        - algorithm, loop_density: See MazeGenerator
+        - seed: Seed from which every worker's generator is derived
+        - num_workers: Number of processes (defaults to the number of cores)
+
+        Returns:
+        - The MazePool opened read-only
+        """
+        num_workers = max(1, min(num_workers or os.cpu_count(), num_mazes))
+        _, size = _sections(num_mazes, num_rows * num_cols)
+        with open(filename, 'wb') as f:
+            header = POOL_MAGIC + np.array([POOL_VERSION, num_mazes, num_rows, num_cols], dtype='<i4').tobytes()
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            f.truncate(size)
+
+        bounds = np.linspace(0, num_mazes, num_workers + 1).astype(int)
+        seeds = np.random.SeedSequence(seed).spawn(num_workers)
+        chunks = [
+            (filename, int(start), int(stop), chunk_seed, num_mazes, num_rows, num_cols, algorithm, loop_density)
+            for start, stop, chunk_seed in zip(bounds[:-1], bounds[1:], seeds)
+        ]
+        if num_workers == 1:
+            _build_chunk(chunks[0])
+        else:
+            with mp.get_context().Pool(num_workers) as pool:
+                pool.map(_build_chunk, chunks)
+        return cls(filename)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate a pool of mazes for training")
+    parser.add_argument("--output", required=True, help="Pool file to write")
+    parser.add_argument("--count", type=int, required=True, help="Number of mazes")
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--cols", type=int, default=6)
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="eller")
+    parser.add_argument("--loop-density", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, help="Number of processes (defaults to the number of cores)")
+    args = parser.parse_args(argv)
+    pool = MazePool.build(args.output, args.count, args.rows, args.cols, algorithm=args.algorithm,
+                          loop_density=args.loop_density, seed=args.seed, num_workers=args.workers)
+    print(f"{len(pool)} mazes of {pool.num_rows}x{pool.num_cols} written to {args.output}")
+
+if __name__ == "__main__":
+    main()
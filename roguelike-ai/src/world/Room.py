@@ -1,5 +1,6 @@
 import pygame as pg
 from typing import Dict, Tuple, List
+from src.world.Maze import WALL_UP, WALL_DOWN, WALL_LEFT, WALL_RIGHT
 
 class Room:
     def __init__(self, x: int, y: int, size: int, room_number: int, tile_size: int):
@@ -17,12 +18,26 @@ class Room:
             'top': {'exists': False, 'range': (0, 0)}
         }
 
-    def setup_doors(self, num_cols: int, num_rows: int, neighbours: list) -> None:
-        """Configura le porte basandosi sulla posizione della stanza nel labirinto."""
+    def setup_doors(self, num_cols: int, num_rows: int, neighbours: list = None, walls: int = None) -> None:
+        """
+        Configura le porte basandosi sulla posizione della stanza nel labirinto.
+
+        Args:
+            neighbours (list): Stanze adiacenti collegate a questa
+            walls (int): In alternativa, i bit dei muri della stanza (vedi Maze.walls)
+        """
         door_size = self.size // 8  # Dimensione della porta (1/8 della stanza)
         door_start = (self.size // 2) - (door_size // 2)
         door_end = (self.size // 2) + (door_size // 2)
 
+        if walls is not None:
+            # Un bit a zero indica una porta su quel lato
+            neighbours = [
+                self.room_number + offset
+                for bit, offset in ((WALL_RIGHT, 1), (WALL_DOWN, num_cols), (WALL_LEFT, -1), (WALL_UP, -num_cols))
+                if not walls & bit
+            ]
+
         # Porta destra
         if (self.room_number + 1) in neighbours:
             self.doors['right'] = {
@@ -1,12 +1,52 @@
-from typing import List, Dict, Set
+from typing import Dict, Iterator, List, Optional, Set
 import random
-import networkx as nx
+import numpy as np
+from src.world.Maze import Maze, ALL_WALLS, WALL_UP, WALL_DOWN, WALL_LEFT, WALL_RIGHT
+
+ALGORITHMS = ("static", "eller", "wilson")
 
 class MazeGenerator:
-    def __init__(self, num_rows: int, num_cols: int):
+    def __init__(self, num_rows: int, num_cols: int, algorithm: str = "static", loop_density: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            num_rows (int): Righe del labirinto
+            num_cols (int): Colonne del labirinto
+            algorithm (str): "static" (REMOVAL_CONFIG), "eller" o "wilson"
+            loop_density (float): Frazione dei muri interni aperti dopo la generazione (0 = labirinto perfetto)
+            seed (int): Seme del generatore casuale usato quando generate_maze non riceve un rng
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown maze algorithm {algorithm!r}, expected one of {ALGORITHMS}")
         self.num_rows = num_rows
         self.num_cols = num_cols
         self.num_rooms = num_rows * num_cols
+        self.algorithm = algorithm
+        self.loop_density = loop_density
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_config(cls, config: Dict, rng: Optional[np.random.Generator] = None,
+                    random_size: bool = False, seed: Optional[int] = None) -> "MazeGenerator":
+        """
+        Generatore descritto dalla sezione maze della configurazione.
+
+        Args:
+            config (dict): Configurazione con maze.min_rows/max_rows/min_cols/max_cols
+                e opzionalmente maze.algorithm, maze.loop_density e maze.seed
+            rng (np.random.Generator): Usato per estrarre le dimensioni con random_size
+            random_size (bool): Estrae righe e colonne entro [min, max] invece di usare i minimi
+            seed (int): Seme del generatore, sostituisce maze.seed
+        """
+        settings = config['maze']
+        seed = seed if seed is not None else settings.get('seed')
+        num_rows, num_cols = settings['min_rows'], settings['min_cols']
+        if random_size:
+            rng = rng if rng is not None else np.random.default_rng(seed)
+            num_rows = int(rng.integers(settings['min_rows'], settings['max_rows'] + 1))
+            num_cols = int(rng.integers(settings['min_cols'], settings['max_cols'] + 1))
+        return cls(num_rows, num_cols, algorithm=settings.get('algorithm', 'static'),
+                   loop_density=settings.get('loop_density', 0.0), seed=seed)
 
     def generate_graph(self) -> Dict[int, Set[int]]:
         """
@@ -36,90 +76,251 @@ class MazeGenerator:
         return graph
     
 
-    def generate_grid_graph(self, rows=4, cols=6):
+    # Predefined removal configuration tailored for a 4x6 grid
+    # Format: {node_id: [neighbor_ids_to_disconnect]}
+    REMOVAL_CONFIG = {
+        0: [1],         # Top row, first node
+        2: [8],         # Top row, third node
+        5: [11],        # Top row, last node
+        6: [7, 12],     # Second row, first node
+        9: [10, 15],    # Second row, fourth node
+        13: [14],       # Third row, second node
+        17: [16, 23],   # Third row, last node
+        19: [13],       # Fourth row, second node
+        21: [15],       # Fourth row, fourth node
+        22: [21]        # Fourth row, fifth node
+    }
+
+    def generate_grid_walls(self, rows=4, cols=6, removal_config=None) -> np.ndarray:
         """
-        Generate a 4x6 grid graph with static edge removals based on an internal configuration.
+        Generate a grid maze with static edge removals based on an internal configuration.
+        
+        The removals are tried in configuration order and an edge is only
+        removed if the rooms stay connected. Instead of checking connectivity
+        for every candidate, the decisions are taken with a union-find: the
+        edges that are never removed are joined first, then the candidates
+        are visited in reverse order and kept only when they join two
+        components. This keeps exactly the edges the sequential check keeps
+        (reverse-delete and Kruskal select the same spanning structure for
+        the same edge order) in near-linear time.
+        
+        Args:
+            rows (int): Number of rows of the grid
+            cols (int): Number of columns of the grid
+            removal_config (dict): {node_id: [neighbor_ids_to_disconnect]},
+                defaults to REMOVAL_CONFIG
         
         Returns:
-            nx.Graph: A 4x6 grid graph with predetermined edges removed
-        """
-        import networkx as nx
-        
-        # Create an empty graph
-        G = nx.Graph()
-        
-        # Generate nodes in a grid structure (4 rows x 6 columns)
-        for r in range(rows):
-            for c in range(cols):
-                node_id = r * cols + c
-                G.add_node(node_id)
-        
-        # Dictionary to store adjacent nodes
-        adjacent_nodes = {}
-        
-        # Add connections between adjacent nodes
-        for r in range(rows):
-            for c in range(cols):
-                current_node = r * cols + c
-                adjacent = []
-                
-                # Right connection
-                if c < cols - 1:
-                    right_node = current_node + 1
-                    G.add_edge(current_node, right_node)
-                    adjacent.append(right_node)
-                
-                # Left connection
-                if c > 0:
-                    left_node = current_node - 1
-                    adjacent.append(left_node)
-                
-                # Down connection
-                if r < rows - 1:
-                    down_node = current_node + cols
-                    G.add_edge(current_node, down_node)
-                    adjacent.append(down_node)
-                
-                # Up connection
-                if r > 0:
-                    up_node = current_node - cols
-                    adjacent.append(up_node)
-                
-                # Store adjacent nodes
-                adjacent_nodes[current_node] = adjacent
-        
-        # Predefined removal configuration tailored for a 4x6 grid
-        # Format: {node_id: [neighbor_ids_to_disconnect]}
-        removal_config = {
-            0: [1],         # Top row, first node
-            2: [8],         # Top row, third node
-            5: [11],        # Top row, last node
-            6: [7, 12],     # Second row, first node
-            9: [10, 15],    # Second row, fourth node
-            13: [14],       # Third row, second node
-            17: [16, 23],   # Third row, last node
-            19: [13],       # Fourth row, second node
-            21: [15],       # Fourth row, fourth node
-            22: [21]        # Fourth row, fifth node
-        }
-        
-        # Remove edges according to the predefined configuration
+            np.ndarray: rows * cols uint8 wall bits of each room (see Maze)
+        """
+        if removal_config is None:
+            removal_config = self.REMOVAL_CONFIG
+        num_rooms = rows * cols
+        
+        # Candidate edges in removal order, skipping pairs that are not
+        # adjacent rooms of this grid (only the first occurrence counts)
+        candidates = []
+        seen = set()
         for node, neighbors_to_remove in removal_config.items():
             for neighbor in neighbors_to_remove:
-                # Check if node and neighbor are within the grid boundaries
-                if (node < rows * cols and neighbor < rows * cols and 
-                    node >= 0 and neighbor >= 0 and 
-                    G.has_edge(node, neighbor)):
-                    
-                    # Create a temporary graph to check connectivity
-                    G_temp = G.copy()
-                    G_temp.remove_edge(node, neighbor)
-                    
-                    # Only remove the edge if it doesn't disconnect the graph
-                    if nx.is_connected(G_temp):
-                        G.remove_edge(node, neighbor)
-        
-        return G
+                edge = (min(node, neighbor), max(node, neighbor))
+                if (0 <= edge[0] and edge[1] < num_rooms and edge not in seen
+                        and self._is_grid_edge(edge[0], edge[1], cols)):
+                    seen.add(edge)
+                    candidates.append(edge)
+        
+        # Only the outer border is closed in the full grid
+        rooms = np.arange(num_rooms)
+        walls = np.zeros(num_rooms, dtype=np.uint8)
+        walls[rooms < cols] |= WALL_UP
+        walls[rooms >= num_rooms - cols] |= WALL_DOWN
+        walls[rooms % cols == 0] |= WALL_LEFT
+        walls[rooms % cols == cols - 1] |= WALL_RIGHT
+        if not candidates:
+            return walls
+        
+        components = _DisjointSet(num_rooms)
+        # Right and down connection of every room that is never removed
+        for node in range(num_rooms):
+            if node % cols < cols - 1 and (node, node + 1) not in seen:
+                components.union(node, node + 1)
+            if node + cols < num_rooms and (node, node + cols) not in seen:
+                components.union(node, node + cols)
+        for node, neighbor in reversed(candidates):
+            # Joining two components means removing this edge would disconnect the maze
+            if components.union(node, neighbor):
+                continue
+            if neighbor - node == 1:
+                walls[node] |= WALL_RIGHT
+                walls[neighbor] |= WALL_LEFT
+            else:
+                walls[node] |= WALL_DOWN
+                walls[neighbor] |= WALL_UP
+        return walls
+
+    def generate_grid_graph(self, rows=4, cols=6, removal_config=None):
+        """
+        networkx view of generate_grid_walls, for tooling that wants a graph.
+        
+        Returns:
+            nx.Graph: A rows x cols grid graph with predetermined edges removed
+        """
+        return Maze(self.generate_grid_walls(rows, cols, removal_config), rows, cols).graph
+
+    @staticmethod
+    def _is_grid_edge(node: int, neighbor: int, cols: int) -> bool:
+        """True if node < neighbor are horizontally or vertically adjacent rooms."""
+        return neighbor - node == cols or (neighbor - node == 1 and node // cols == neighbor // cols)
+
+    def eller_rows(self, rows: int, cols: int, rng: np.random.Generator) -> Iterator[np.ndarray]:
+        """
+        Eller's algorithm: generate a perfect maze one row at a time, keeping
+        only the set label of each cell of the current row (O(cols) memory).
+        
+        Yields:
+            np.ndarray: cols uint8 wall bits of each row, top to bottom
+        """
+        sets = np.arange(cols)
+        next_label = cols
+        open_up = np.zeros(cols, dtype=bool)
+        for row in range(rows):
+            last_row = row == rows - 1
+            walls = np.full(cols, ALL_WALLS, dtype=np.uint8)
+            walls[open_up] ^= WALL_UP
+            
+            # Join adjacent cells of different sets at random (all of them on the last row)
+            join = rng.random(cols - 1) < 0.5
+            parent = {}
+            
+            def find(label):
+                while parent.get(label, label) != label:
+                    parent[label] = parent.get(parent[label], parent[label])
+                    label = parent[label]
+                return label
+            
+            for col in range(cols - 1):
+                left, right = find(sets[col]), find(sets[col + 1])
+                if left != right and (last_row or join[col]):
+                    parent[right] = left
+                    walls[col] ^= WALL_RIGHT
+                    walls[col + 1] ^= WALL_LEFT
+            if parent:
+                sets = np.array([find(label) for label in sets.tolist()])
+            
+            if last_row:
+                yield walls
+                return
+            
+            # Every set goes down at least once: force the cell with the
+            # smallest random key of each set, the others go down at random
+            keys = rng.random(cols)
+            order = np.lexsort((keys, sets))
+            _, first = np.unique(sets[order], return_index=True)
+            open_up = keys < 0.5
+            open_up[order[first]] = True
+            walls[open_up] ^= WALL_DOWN
+            yield walls
+            
+            # Cells that did not go down start new sets on the next row
+            fresh = ~open_up
+            sets = np.where(fresh, 0, sets)
+            sets[fresh] = next_label + np.arange(np.count_nonzero(fresh))
+            next_label += cols
+
+    def generate_eller_walls(self, rows: int, cols: int, rng: np.random.Generator) -> np.ndarray:
+        """Perfect maze from eller_rows, as rows * cols uint8 wall bits."""
+        return np.concatenate(list(self.eller_rows(rows, cols, rng)))
+
+    def generate_wilson_walls(self, rows: int, cols: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Wilson's algorithm: a uniformly random spanning tree of the grid, built
+        from loop-erased random walks.
+        
+        Returns:
+            np.ndarray: rows * cols uint8 wall bits of each room
+        """
+        num_rooms = rows * cols
+        # Scalar draws are much cheaper with the standard library generator
+        walker = random.Random(int(rng.integers(2 ** 63)))
+        walls = np.full(num_rooms, ALL_WALLS, dtype=np.uint8).tolist()
+        offsets = (-cols, cols, -1, 1)
+        bits = (WALL_UP, WALL_DOWN, WALL_LEFT, WALL_RIGHT)
+        opposite = (WALL_DOWN, WALL_UP, WALL_RIGHT, WALL_LEFT)
+        
+        in_tree = [False] * num_rooms
+        in_tree[walker.randrange(num_rooms)] = True
+        exit_direction = [0] * num_rooms
+        order = list(range(num_rooms))
+        walker.shuffle(order)
+        
+        for start in order:
+            # Random walk until the tree, remembering only the last exit of each
+            # room, which erases the loops
+            room = start
+            while not in_tree[room]:
+                row, col = divmod(room, cols)
+                while True:
+                    direction = walker.randrange(4)
+                    if ((direction == 0 and row > 0) or (direction == 1 and row < rows - 1)
+                            or (direction == 2 and col > 0) or (direction == 3 and col < cols - 1)):
+                        break
+                exit_direction[room] = direction
+                room += offsets[direction]
+            # Add the loop-erased path to the tree
+            room = start
+            while not in_tree[room]:
+                in_tree[room] = True
+                direction = exit_direction[room]
+                neighbor = room + offsets[direction]
+                walls[room] ^= bits[direction]
+                walls[neighbor] ^= opposite[direction]
+                room = neighbor
+        return np.array(walls, dtype=np.uint8)
+
+    @staticmethod
+    def add_loops(walls: np.ndarray, cols: int, loop_density: float, rng: np.random.Generator) -> np.ndarray:
+        """
+        Braid the maze: open each interior wall with probability loop_density.
+        Opening walls never disconnects rooms, it only adds alternative paths.
+        
+        Args:
+            walls (np.ndarray): uint8 wall bits, modified in place
+            loop_density (float): 0 keeps the maze as is, 1 opens every interior wall
+        
+        Returns:
+            np.ndarray: walls
+        """
+        if loop_density <= 0:
+            return walls
+        rooms = np.arange(len(walls))
+        right = rooms[(rooms % cols < cols - 1) & (walls & WALL_RIGHT > 0)]
+        right = right[rng.random(len(right)) < loop_density]
+        walls[right] ^= WALL_RIGHT
+        walls[right + 1] ^= WALL_LEFT
+        down = rooms[(rooms < len(walls) - cols) & (walls & WALL_DOWN > 0)]
+        down = down[rng.random(len(down)) < loop_density]
+        walls[down] ^= WALL_DOWN
+        walls[down + cols] ^= WALL_UP
+        return walls
+
+    def generate_maze(self, rng: Optional[np.random.Generator] = None) -> Maze:
+        """
+        Genera il labirinto con le sue tabelle di distanza e di percorso precalcolate.
+        Args:
+            rng (np.random.Generator): Generatore casuale degli algoritmi procedurali
+                (di default quello del generatore)
+        Returns:
+            Maze: Muri delle stanze con le tabelle distance/next_hop
+        """
+        rng = rng if rng is not None else self.rng
+        if self.algorithm == "eller":
+            walls = self.generate_eller_walls(self.num_rows, self.num_cols, rng)
+        elif self.algorithm == "wilson":
+            walls = self.generate_wilson_walls(self.num_rows, self.num_cols, rng)
+        else:
+            walls = self.generate_grid_walls(self.num_rows, self.num_cols)
+        walls = self.add_loops(walls, self.num_cols, self.loop_density, rng)
+        return Maze(walls, self.num_rows, self.num_cols)
 
     def get_neighbors(self, room_id: int) -> List[int]:
         """
@@ -149,4 +350,28 @@ class MazeGenerator:
         if row < self.num_rows - 1:
             neighbors.append(room_id + self.num_cols)
 
-        return neighbors
\ No newline at end of file
+        return neighbors
+
+class _DisjointSet:
+    """Union-find over room ids with path halving and union by size."""
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the components of a and b, False if they were already one."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return True
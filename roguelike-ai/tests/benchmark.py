@@ -0,0 +1,299 @@
+"""
+Performance benchmarks for the environment, the agents, the maze generator,
+the alphabot decision server and the import time of the main modules.
+
+Usage (from the roguelike-ai directory):
+    python tests/benchmark.py --output benchmark_baseline.json
+    python tests/benchmark.py --compare benchmark_baseline.json --threshold 0.25
+
+The comparison exits with status 1 when a metric is worse than the baseline
+by more than the threshold (a fraction of the baseline value).
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(os.path.dirname(PROJECT_ROOT), "alphabot", "server")
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+def _metric(value, unit, higher_is_better):
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+def bench_env(num_steps=20000, num_resets=2000):
+    from src.ai.MazeEnv import MazeEnv
+
+    env = MazeEnv()
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for _ in range(num_resets):
+        env.reset()
+    reset_time = (time.perf_counter() - start) / num_resets
+
+    actions = np.random.default_rng(0).integers(0, env.action_space.n, size=num_steps)
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, truncated, _ = env.step(int(action))
+        if done or truncated:
+            env.reset()
+    steps_per_sec = num_steps / (time.perf_counter() - start)
+
+    # Fresh maze at every reset, sampled from a pre-generated pool
+    from src.world.MazePool import MazePool
+    with tempfile.TemporaryDirectory() as directory:
+        pool = MazePool.build(os.path.join(directory, "mazes.pool"), 1000, env.sim.NUM_ROWS, env.sim.NUM_COLS, seed=0)
+        pool_env = MazeEnv(reuse_maze=False, maze_pool=pool)
+        pool_env.reset(seed=0)
+        start = time.perf_counter()
+        for _ in range(num_resets):
+            pool_env.reset()
+        pool_reset_time = (time.perf_counter() - start) / num_resets
+
+    return {
+        'env_step_per_sec': _metric(steps_per_sec, 'steps/s', True),
+        'env_reset_latency_us': _metric(reset_time * 1e6, 'us', False),
+        'env_reset_pool_latency_us': _metric(pool_reset_time * 1e6, 'us', False),
+    }
+
+def bench_generator(sizes=((4, 6), (16, 16), (32, 32), (64, 64)), repeats=3):
+    from src.world.generator import MazeGenerator
+
+    results = {}
+    # Untimed warm-up, the first graph build pays the lazy networkx import
+    MazeGenerator(*sizes[0]).generate_grid_graph(*sizes[0])
+    for rows, cols in sizes:
+        generator = MazeGenerator(rows, cols)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            generator.generate_grid_graph(rows, cols)
+        elapsed = (time.perf_counter() - start) / repeats
+        results[f'generator_{rows}x{cols}_ms'] = _metric(elapsed * 1000, 'ms', False)
+
+    # Canonical wall-bit representation, without the networkx view
+    for rows, cols in sizes + ((1000, 1000),):
+        generator = MazeGenerator(rows, cols)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            generator.generate_grid_walls(rows, cols)
+        elapsed = (time.perf_counter() - start) / repeats
+        results[f'generator_walls_{rows}x{cols}_ms'] = _metric(elapsed * 1000, 'ms', False)
+
+    # Fresh procedural training layouts (walls and transitions, path tables stay lazy)
+    for algorithm in ("eller", "wilson"):
+        generator = MazeGenerator(4, 6, algorithm=algorithm, seed=0)
+        start = time.perf_counter()
+        for _ in range(1000):
+            generator.generate_maze()
+        layouts_per_sec = 1000 / (time.perf_counter() - start)
+        results[f'generator_{algorithm}_4x6_layouts_per_sec'] = _metric(layouts_per_sec, 'layouts/s', True)
+    return results
+
+def bench_qlearning(num_episodes=2000):
+    from src.ai.MazeEnv import MazeEnv
+    from src.ai.QLearningAgent import QLearningAgent
+    from src.ai.VecMazeEnv import VecMazeEnv
+
+    agent = QLearningAgent(MazeEnv())
+    agent.env.reset(seed=0)
+    start = time.perf_counter()
+    agent.train(num_episodes=num_episodes)
+    episodes_per_sec = num_episodes / (time.perf_counter() - start)
+
+    agent = QLearningAgent(VecMazeEnv(num_envs=64))
+    agent.env.reset(seed=0)
+    start = time.perf_counter()
+    agent.train_vectorized(num_episodes=num_episodes)
+    vectorized_per_sec = num_episodes / (time.perf_counter() - start)
+    start = time.perf_counter()
+    agent.evaluate()
+    evaluation_time = time.perf_counter() - start
+    return {
+        'qlearning_evaluate_all_pairs_ms': _metric(evaluation_time * 1000, 'ms', False),
+        'qlearning_train_episodes_per_sec': _metric(episodes_per_sec, 'episodes/s', True),
+        'qlearning_train_vectorized_episodes_per_sec': _metric(vectorized_per_sec, 'episodes/s', True),
+    }
+
+def bench_dqn_replay(batch_sizes=(32, 256), repeats=5):
+    # DQNAgent only imports keras when it builds its network
+    if importlib.util.find_spec("keras") is None:
+        return {}
+    from src.ai.DQNAgent import DQNAgent
+
+    rng = np.random.default_rng(0)
+    agent = DQNAgent(state_size=2, action_size=4)
+    for _ in range(4 * max(batch_sizes)):
+        agent.remember(rng.integers(0, 24, size=2).astype(np.float32), int(rng.integers(4)),
+                       float(rng.normal()), rng.integers(0, 24, size=2).astype(np.float32), bool(rng.random() < 0.1))
+    results = {}
+    for batch_size in batch_sizes:
+        agent.replay(batch_size)  # warm up the graph
+        start = time.perf_counter()
+        for _ in range(repeats):
+            agent.replay(batch_size)
+        elapsed = (time.perf_counter() - start) / repeats
+        results[f'dqn_replay_{batch_size}_ms'] = _metric(elapsed * 1000, 'ms', False)
+
+    state = np.array([0, 23], dtype=np.float32)
+    start = time.perf_counter()
+    for _ in range(1000):
+        agent.act(state, explore=False)
+    results['dqn_act_latency_us'] = _metric((time.perf_counter() - start) * 1000, 'us', False)
+    return results
+
+def bench_imports(modules=("src.ai", "src.ai.QLearningAgent", "src.ai.MazeEnv", "src.core.Simulation"),
+                  repeats=3):
+    """Import time of each module in a fresh interpreter (best of repeats)."""
+    results = {}
+    for module in modules:
+        code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+        timings = [
+            float(subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, check=True,
+                                 capture_output=True, text=True).stdout)
+            for _ in range(repeats)
+        ]
+        results[f'import_{module.replace(".", "_")}_ms'] = _metric(min(timings) * 1000, 'ms', False)
+    return results
+
+def _connect(port, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn = socket.create_connection(("127.0.0.1", port), timeout=timeout)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return conn
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def bench_server(rounds=200):
+    if not os.path.isdir(SERVER_DIR):
+        return {}
+
+    port = _free_port()
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    # Empty policy store: every run compiles the policy, nothing is left in the tree
+    policy_dir = tempfile.TemporaryDirectory()
+    launch = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(port), "--policy-dir", policy_dir.name],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        clients = [_connect(port)]
+        # Process start, imports, model load and listen
+        cold_start = time.perf_counter() - launch
+        clients.append(_connect(port))
+        for client in clients:
+            client.recv(4096)  # maze dimensions
+
+        latencies = []
+        for round_index in range(rounds):
+            rooms = (round_index % 24, 23 - round_index % 24)
+            start = time.perf_counter()
+            for client, room in zip(clients, rooms):
+                client.send(str(room).encode("utf-8"))
+            for client in clients:
+                client.recv(4096)
+            latencies.append(time.perf_counter() - start)
+            for client in clients:
+                client.send("DONE".encode("utf-8"))
+            # Keep DONE and the next room in separate TCP segments
+            time.sleep(0.002)
+
+        for client in clients:
+            client.close()
+    finally:
+        server.kill()
+        server.wait()
+        policy_dir.cleanup()
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'server_cold_start_ms': _metric(cold_start * 1000, 'ms', False),
+        'server_round_trip_p50_ms': _metric(float(np.percentile(latencies, 50)), 'ms', False),
+        'server_round_trip_p95_ms': _metric(float(np.percentile(latencies, 95)), 'ms', False),
+    }
+
+BENCHMARKS = {
+    'env': bench_env,
+    'generator': bench_generator,
+    'qlearning': bench_qlearning,
+    'dqn': bench_dqn_replay,
+    'server': bench_server,
+    'imports': bench_imports,
+}
+
+def run(selected=None):
+    metrics = {}
+    for name, bench in BENCHMARKS.items():
+        if selected and name not in selected:
+            continue
+        results = bench()
+        if not results:
+            print(f"{name}: skipped")
+        for key, metric in results.items():
+            print(f"{key}: {metric['value']:.3f} {metric['unit']}")
+        metrics.update(results)
+    return {
+        'host': {'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count()},
+        'metrics': metrics,
+    }
+
+def compare(results, baseline, threshold):
+    """
+    Returns:
+    - List of (metric, baseline value, current value, relative change) that regressed
+    """
+    regressions = []
+    for key, reference in baseline['metrics'].items():
+        current = results['metrics'].get(key)
+        if current is None or not reference['value']:
+            continue
+        change = (current['value'] - reference['value']) / reference['value']
+        worse = -change if reference['higher_is_better'] else change
+        if worse > threshold:
+            regressions.append((key, reference['value'], current['value'], change))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative regression before failing (default 0.25)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    args = parser.parse_args(argv)
+
+    results = run(args.only)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for key, reference, current, change in regressions:
+            print(f"REGRESSION {key}: {reference:.3f} -> {current:.3f} ({change:+.1%})")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
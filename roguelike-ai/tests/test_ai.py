@@ -0,0 +1,291 @@
+import json
+import networkx as nx
+import numpy as np
+import pytest
+from src.ai.MazeEnv import MazeEnv
+from src.ai.QLearningAgent import QLearningAgent
+from src.ai.VecMazeEnv import VecMazeEnv
+from src.ai.model_io import ModelMismatchError
+from src.ai.PolicyTable import PolicyTable
+from src.ai.ReplayBuffer import ReplayBuffer
+from src.ai.PrioritizedReplayBuffer import PrioritizedReplayBuffer
+from src.ai.NumpyMLP import NumpyMLP
+from src.ai.PolicyStore import PolicyStore
+from src.ai.evaluation import evaluate_store, summarize
+from src.ai.rewards import shaped_reward, shaped_rewards, WALL_PENALTY
+from src.world.Maze import Maze
+from src.world.generator import MazeGenerator
+
+
+def test_vec_env_penalizes_walls_and_autoresets():
+    env = VecMazeEnv(num_envs=64)
+    states, _ = env.reset(seed=0)
+    # Pick for every environment an action that hits a wall, if its room has one
+    walls = env.transitions[states[:, 0]] < 0
+    has_wall = walls.any(axis=1)
+    actions = np.where(has_wall, walls.argmax(axis=1), 0)
+    _, rewards, terminations, truncations, infos = env.step(actions)
+
+    assert np.all(truncations[has_wall])
+    assert np.all(rewards[has_wall] == -5)
+    assert np.array_equal(infos['final_obs'][has_wall], states[has_wall])
+    assert not np.any(terminations & truncations)
+
+
+def test_env_reset_reuses_maze_and_regenerates_every_k_episodes():
+    env = MazeEnv(regenerate_every=3)
+    mazes = []
+    for _ in range(6):
+        env.reset()
+        mazes.append(env.sim.maze)
+    # The maze built in __init__ serves the first three episodes
+    assert mazes[0] is mazes[1] is mazes[2]
+    assert mazes[3] is not mazes[2]
+    assert mazes[3] is mazes[4] is mazes[5]
+
+
+def test_scalar_and_vectorized_rewards_agree():
+    previous, current, caught = np.meshgrid([0, 1, 2], [0, 1, 2], [False, True], indexing='ij')
+    legal = previous % 2 == 0
+    rewards = shaped_rewards(previous, current, caught, legal)
+    for index in np.ndindex(rewards.shape):
+        expected = shaped_reward(previous[index], current[index], caught[index]) if legal[index] else WALL_PENALTY
+        assert rewards[index] == expected
+
+
+def test_episodes_are_truncated_by_step_budget():
+    env = VecMazeEnv(num_envs=32, max_episode_steps=1)
+    env.reset(seed=0)
+    _, _, terminations, truncations, infos = env.step(env.action_space.sample())
+    assert np.all(terminations ^ truncations)
+    assert np.all(infos['_final_obs'])
+    assert np.all(env.steps == 0)
+
+
+def test_parallel_training_collects_requested_episodes():
+    agent = QLearningAgent(MazeEnv())
+    q_table = agent.train_parallel(num_episodes=50, num_workers=2, batch_size=64, sync_interval=1, seed=0)
+    assert len(agent.training_history['episode_rewards']) == 50
+    assert np.any(q_table != 0)
+
+
+def _crashing_worker(*args):
+    raise RuntimeError("worker crashed")
+
+
+def test_parallel_training_fails_when_a_worker_dies(monkeypatch):
+    import src.ai.QLearningAgent as q_learning
+    monkeypatch.setattr(q_learning, "rollout_worker", _crashing_worker)
+    agent = QLearningAgent(MazeEnv())
+    with pytest.raises(RuntimeError, match="exited with code"):
+        agent.train_parallel(num_episodes=10, num_workers=2)
+
+
+def test_solved_q_table_catches_the_target_without_hitting_walls():
+    agent = QLearningAgent(MazeEnv())
+    q_table = agent.solve()
+    assert q_table.shape == agent.q_table.shape
+
+    env = VecMazeEnv(num_envs=256, max_episode_steps=50)
+    states, _ = env.reset(seed=0)
+    for _ in range(50):
+        actions = q_table[states[:, 0], states[:, 1]].argmax(axis=1)
+        states, _, _, truncations, _ = env.step(actions)
+        assert not truncations.any()
+
+
+def test_model_round_trip_and_layout_check(tmp_path):
+    agent = QLearningAgent(MazeEnv())
+    agent.solve()
+    filename = str(tmp_path / "model.npy")
+    agent.save_model(filename)
+
+    loaded = QLearningAgent(MazeEnv())
+    loaded.load_model(filename, mmap=True)
+    assert isinstance(loaded.q_table, np.memmap)
+    assert np.array_equal(loaded.q_table, agent.q_table)
+
+    header = json.loads((tmp_path / "model.json").read_text())
+    header['layout_hash'] = "0" * 40
+    (tmp_path / "model.json").write_text(json.dumps(header))
+    with pytest.raises(ModelMismatchError):
+        loaded.load_model(filename)
+
+
+def test_policy_table_matches_masked_greedy_q(tmp_path):
+    agent = QLearningAgent(MazeEnv())
+    agent.q_table = np.random.default_rng(0).normal(size=agent.q_table.shape)
+    maze = agent.env.sim.maze
+    policy = agent.export_policy(str(tmp_path / "policy.npy"))
+
+    assert policy.actions.dtype == np.uint8
+    rooms = np.arange(maze.num_rooms)
+    players, targets = np.meshgrid(rooms, rooms, indexing='ij')
+    actions = policy.batch_actions(players.ravel(), targets.ravel())
+    assert np.all(maze.transitions[players.ravel(), actions] >= 0)
+    masked = np.where(maze.transitions[:, None, :] < 0, -np.inf, agent.q_table)
+    assert np.array_equal(actions, masked.argmax(axis=-1).ravel())
+
+    loaded = PolicyTable.load(str(tmp_path / "policy.npy"), maze=maze)
+    assert loaded.action(3, 17) == policy.action(3, 17)
+
+
+def test_update_batch_matches_sequential_updates_for_duplicates():
+    agent = QLearningAgent(MazeEnv())
+    agent.q_table = np.random.default_rng(0).normal(size=agent.q_table.shape)
+    expected = agent.q_table.copy()
+    # The same state-action pair three times, towards the same target
+    states = np.array([[0, 5], [0, 5], [0, 5], [2, 7]])
+    actions = np.array([1, 1, 1, 3])
+    rewards = np.array([1.0, 1.0, 1.0, -0.3])
+    next_states = np.array([[1, 5], [1, 5], [1, 5], [3, 7]])
+    dones = np.array([False, False, False, True])
+
+    target = 1.0 + agent.gamma * expected[1, 5].max()
+    for _ in range(3):
+        expected[0, 5, 1] = (1 - agent.alpha) * expected[0, 5, 1] + agent.alpha * target
+    expected[2, 7, 3] = (1 - agent.alpha) * expected[2, 7, 3] + agent.alpha * -0.3
+
+    agent.update_batch(states, actions, rewards, next_states, dones)
+    assert np.allclose(agent.q_table, expected)
+
+    # Updates are written through non-contiguous tables as well
+    agent.q_table = np.asfortranarray(np.zeros_like(expected))
+    agent.update_batch(states[:1], actions[:1], rewards[:1], next_states[:1], dones[:1])
+    assert agent.q_table[0, 5, 1] == pytest.approx(agent.alpha * 1.0)
+
+
+def test_vectorized_training_collects_requested_episodes():
+    agent = QLearningAgent(VecMazeEnv(num_envs=16, max_episode_steps=50))
+    agent.env.reset(seed=0)
+    agent.train_vectorized(num_episodes=300)
+    assert len(agent.training_history['episode_rewards']) == 300
+    assert np.any(agent.q_table != 0)
+
+
+def test_replay_buffer_wraps_around_and_samples_stored_transitions():
+    buffer = ReplayBuffer(capacity=5, state_size=2, rng=np.random.default_rng(0))
+    for i in range(8):
+        buffer.add(np.array([i, i + 1]), i % 4, float(i), np.array([i + 1, i + 2]), i == 7)
+
+    assert len(buffer) == 5
+    # The three oldest transitions were overwritten
+    assert sorted(buffer.rewards) == [3.0, 4.0, 5.0, 6.0, 7.0]
+    states, actions, rewards, next_states, dones = buffer.sample(16)
+    assert states.shape == (16, 2)
+    assert np.all(rewards >= 3)
+    assert np.array_equal(states[:, 0], rewards)
+    assert np.array_equal(next_states, states + 1)
+    assert np.array_equal(dones, rewards == 7)
+
+
+def test_prioritized_replay_samples_in_proportion_to_priority():
+    buffer = PrioritizedReplayBuffer(capacity=6, state_size=2, alpha=1.0, rng=np.random.default_rng(0))
+    for i in range(6):
+        buffer.add(np.array([i, 0]), 0, float(i), np.array([i, 1]), False)
+    buffer.update_priorities(np.arange(6), np.array([1.0, 0.0, 0.0, 3.0, 0.0, 4.0]))
+    assert buffer.tree.total == pytest.approx(8.0, abs=1e-4)
+
+    counts = np.zeros(6)
+    for _ in range(200):
+        _, _, rewards, _, _, indices, weights = buffer.sample(8)
+        np.add.at(counts, indices, 1)
+        assert np.array_equal(rewards, indices)
+        assert weights.max() == pytest.approx(1.0)
+    assert np.allclose(counts / counts.sum(), [1 / 8, 0, 0, 3 / 8, 0, 4 / 8], atol=0.02)
+
+
+def test_numpy_mlp_round_trip_and_batched_predict(tmp_path):
+    rng = np.random.default_rng(0)
+    weights = [rng.normal(size=(2, 24)), rng.normal(size=(24, 24)), rng.normal(size=(24, 4))]
+    biases = [rng.normal(size=24), rng.normal(size=24), rng.normal(size=4)]
+    network = NumpyMLP(weights, biases, ['relu', 'relu', 'linear'])
+    states = rng.integers(0, 24, size=(10, 2))
+
+    hidden = np.maximum(states @ weights[0] + biases[0], 0)
+    hidden = np.maximum(hidden @ weights[1] + biases[1], 0)
+    expected = hidden @ weights[2] + biases[2]
+    assert np.allclose(network.predict(states), expected, rtol=1e-4, atol=1e-3)
+    assert np.allclose(network.predict(states[3]), expected[3:4], rtol=1e-4, atol=1e-3)
+
+    network.save(tmp_path / "dqn.npz")
+    loaded = NumpyMLP.load(tmp_path / "dqn.npz")
+    assert np.array_equal(loaded.predict(states), network.predict(states))
+
+
+def test_act_batch_is_greedy_without_exploration_and_uniform_with_it():
+    agent = QLearningAgent(MazeEnv())
+    agent.q_table = np.random.default_rng(0).normal(size=agent.q_table.shape)
+    states = np.random.default_rng(1).integers(0, agent.num_rooms, size=(4000, 2))
+
+    greedy = agent.q_table[states[:, 0], states[:, 1]].argmax(axis=1)
+    assert np.array_equal(agent.act_batch(states, epsilon=0.0), greedy)
+
+    counts = np.bincount(agent.act_batch(states, epsilon=1.0), minlength=4)
+    assert np.all(np.abs(counts / len(states) - 0.25) < 0.03)
+    # Per-state exploration rates
+    epsilons = np.where(np.arange(len(states)) % 2 == 0, 0.0, 1.0)
+    actions = agent.act_batch(states, epsilon=epsilons)
+    assert np.array_equal(actions[::2], greedy[::2])
+
+
+def test_headless_evaluation_matches_env_rollouts():
+    env = MazeEnv(max_episode_steps=30)
+    agent = QLearningAgent(env)
+    agent.q_table = np.random.default_rng(0).normal(size=agent.q_table.shape)
+    results, summary = agent.evaluate(num_episodes=40, seed=0)
+
+    for (player, target), caught, illegal, steps, reward in zip(
+        results['starts'], results['caught'], results['illegal'], results['steps'], results['rewards']
+    ):
+        env.reset()
+        env.sim.player1_room, env.sim.player2_room = int(player), int(target)
+        env.sim.previous_distance_room = env.sim.maze.shortest_path_length(int(player), int(target))
+        total_reward, done, truncated, info = 0.0, False, False, None
+        for step in range(1, 31):
+            _, r, done, truncated, _ = env.step(int(np.argmax(agent.q_table[env.sim.player1_room, env.sim.player2_room])))
+            total_reward += r
+            if done or truncated:
+                break
+        assert (done, step, illegal) == (caught, steps, truncated and step < 30)
+        assert total_reward == pytest.approx(reward)
+
+    assert summary['episodes'] == 40
+    with pytest.deprecated_call():
+        assert len(agent.test(num_tests=3, render=False)) == 3
+    solved = QLearningAgent(MazeEnv())
+    solved.solve()
+    _, summary = solved.evaluate(num_workers=2)
+    assert summary['success_rate'] == 1.0
+    assert summary['illegal_move_rate'] == 0.0
+
+
+def test_policy_store_indexes_policies_by_layout(tmp_path):
+    store = PolicyStore(str(tmp_path), capacity=1)
+    env = MazeEnv(policy_store=store)
+    first_maze = env.sim.maze
+    assert env.policy() is None
+    first = store.get_or_solve(first_maze)
+    assert env.policy() is first
+
+    # Switch to another arena: the full grid with every door open
+    grid = MazeGenerator(first_maze.num_rows, first_maze.num_cols).generate_graph()
+    second_maze = Maze.from_graph(nx.Graph(grid), first_maze.num_rows, first_maze.num_cols)
+    env.sim.maze = second_maze
+    assert second_maze.layout_hash() != first_maze.layout_hash()
+    second = store.get_or_solve(second_maze)
+    assert env.policy() is second
+    assert store.layouts() == sorted([first_maze.layout_hash(), second_maze.layout_hash()])
+
+    # The first policy was evicted from the LRU and is mapped back from disk
+    reloaded = store.get(first_maze)
+    assert isinstance(reloaded.actions, np.memmap)
+    assert np.array_equal(reloaded.actions, first.actions)
+    assert summarize(evaluate_store(store, first_maze))['success_rate'] == 1.0
+
+    # A policy compiled from another model is stale, in memory and on disk
+    store.put(first_maze, first, source={'model_sha1': "a"})
+    assert store.get(first_maze, source={'model_sha1': "a"}) is first
+    assert store.get(first_maze, source={'model_sha1': "b"}) is None
+    assert PolicyStore(str(tmp_path)).get(first_maze, source={'model_sha1': "b"}) is None
+    assert PolicyStore(str(tmp_path)).get(first_maze, source={'model_sha1': "a"}) is not None
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+import numpy as np
+from config import load_config
+from src.core.Simulation import MazeSimulation
+
+
+def test_simulation_spawns_players_in_distinct_rooms():
+    sim = MazeSimulation(load_config(), rng=np.random.default_rng(0))
+    for _ in range(50):
+        sim.reset()
+        assert sim.player1_room != sim.player2_room
+        assert 0 <= sim.player1_room < sim.NUM_ROOMS
+        assert 0 <= sim.player2_room < sim.NUM_ROOMS
+        assert not sim.check_collision_between_player()
+
+
+def test_env_does_not_import_pygame():
+    code = (
+        "import sys\n"
+        "from src.ai.MazeEnv import MazeEnv\n"
+        "env = MazeEnv()\n"
+        "env.reset(seed=0)\n"
+        "env.step(0)\n"
+        "assert 'pygame' not in sys.modules\n"
+    )
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", code], cwd=project_root, check=True)
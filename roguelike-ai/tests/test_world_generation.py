@@ -0,0 +1,147 @@
+import pickle
+import random
+import networkx as nx
+import numpy as np
+import pytest
+from config import load_config
+from src.core.Simulation import MazeSimulation
+from src.ai.MazeEnv import MazeEnv
+from src.world.MazePool import MazePool
+from src.world.generator import MazeGenerator
+from src.world.Maze import Maze, DIRECTIONS
+from src.world.Room import Room
+
+
+def test_maze_path_tables_match_graph():
+    maze = MazeGenerator(4, 6).generate_maze()
+    graph = maze.graph
+    for source in graph.nodes:
+        for target in graph.nodes:
+            assert maze.shortest_path_length(source, target) == nx.shortest_path_length(graph, source, target)
+            if source != target:
+                hop = maze.next_room(source, target)
+                assert graph.has_edge(source, hop)
+                assert maze.distance[hop, target] == maze.distance[source, target] - 1
+            else:
+                assert maze.next_room(source, target) == source
+
+
+def test_transition_table_matches_graph():
+    maze = MazeGenerator(4, 6).generate_maze()
+    offsets = dict(zip(DIRECTIONS, (-maze.num_cols, maze.num_cols, -1, 1)))
+    for room in range(maze.num_rooms):
+        for action, direction in enumerate(DIRECTIONS):
+            neighbor = room + offsets[direction]
+            if maze.graph.has_edge(room, neighbor):
+                assert maze.target_room(room, action) == neighbor
+            else:
+                assert maze.target_room(room, action) == -1
+        assert maze.action_mask(room).sum() == maze.graph.degree(room)
+
+
+def _sequential_removals(rows, cols, removal_config):
+    # Reference: copy the graph and check connectivity for every candidate
+    G = nx.grid_2d_graph(rows, cols)
+    G = nx.relabel_nodes(G, {(r, c): r * cols + c for r, c in G.nodes})
+    for node, neighbors_to_remove in removal_config.items():
+        for neighbor in neighbors_to_remove:
+            if G.has_edge(node, neighbor):
+                G_temp = G.copy()
+                G_temp.remove_edge(node, neighbor)
+                if nx.is_connected(G_temp):
+                    G.remove_edge(node, neighbor)
+    return G
+
+
+def test_union_find_removals_match_sequential_connectivity_check():
+    rng = random.Random(0)
+    for rows, cols in ((4, 6), (7, 9), (12, 5)):
+        generator = MazeGenerator(rows, cols)
+        for _ in range(5):
+            removal_config = {}
+            for node in rng.sample(range(rows * cols), rows * cols // 2):
+                removal_config[node] = rng.sample(generator.get_neighbors(node), 2)
+            expected = _sequential_removals(rows, cols, removal_config)
+            graph = generator.generate_grid_graph(rows, cols, removal_config)
+            assert {frozenset(e) for e in graph.edges} == {frozenset(e) for e in expected.edges}
+            assert nx.is_connected(graph)
+    assert {frozenset(e) for e in MazeGenerator(4, 6).generate_grid_graph().edges} == \
+        {frozenset(e) for e in _sequential_removals(4, 6, MazeGenerator.REMOVAL_CONFIG).edges}
+
+
+def test_wall_bits_round_trip_and_drive_room_doors():
+    maze = MazeGenerator(4, 6).generate_maze()
+    assert maze.walls.dtype == np.uint8
+    assert np.array_equal(Maze.from_graph(maze.graph, 4, 6).walls, maze.walls)
+    restored = Maze.from_bytes(maze.to_bytes())
+    assert np.array_equal(restored.walls, maze.walls)
+    assert restored.layout_hash() == maze.layout_hash()
+
+    for room_number in range(maze.num_rooms):
+        from_walls = Room(0, 0, 160, room_number, 20)
+        from_walls.setup_doors(6, 4, walls=int(maze.walls[room_number]))
+        from_graph = Room(0, 0, 160, room_number, 20)
+        from_graph.setup_doors(6, 4, list(maze.graph.neighbors(room_number)))
+        assert from_walls.doors == from_graph.doors
+
+
+@pytest.mark.parametrize("algorithm", ["eller", "wilson"])
+def test_procedural_generators_build_seedable_spanning_trees(algorithm):
+    for rows, cols in ((4, 6), (7, 8), (1, 5), (6, 1)):
+        generator = MazeGenerator(rows, cols, algorithm=algorithm, seed=0)
+        for _ in range(10):
+            graph = generator.generate_maze().graph
+            assert nx.is_connected(graph)
+            assert graph.number_of_edges() == rows * cols - 1
+    first = MazeGenerator(7, 8, algorithm=algorithm, seed=3).generate_maze()
+    again = MazeGenerator(7, 8, algorithm=algorithm, seed=3).generate_maze()
+    assert first.layout_hash() == again.layout_hash()
+
+    braided = MazeGenerator(7, 8, algorithm=algorithm, loop_density=0.5, seed=3).generate_maze()
+    assert braided.graph.number_of_edges() > 7 * 8 - 1
+    assert nx.is_connected(braided.graph)
+
+
+def test_eller_streams_rows_and_simulation_uses_configured_algorithm():
+    rows = list(MazeGenerator(5, 9).eller_rows(5, 9, np.random.default_rng(0)))
+    assert [row.shape for row in rows] == [(9,)] * 5
+
+    config = load_config()
+    config['maze'].update(algorithm='wilson', seed=1)
+    sim = MazeSimulation(config, rng=np.random.default_rng(0))
+    layouts = {sim.maze.layout_hash()}
+    for _ in range(5):
+        sim.regenerate()
+        layouts.add(sim.maze.layout_hash())
+    assert len(layouts) == 6
+
+    # The first maze follows maze.seed, whatever the env rng
+    other = MazeSimulation(config, rng=np.random.default_rng(1))
+    assert other.maze.layout_hash() in layouts
+    assert MazeSimulation(config, seed=2).maze.layout_hash() not in layouts
+    sized = MazeGenerator.from_config(config, rng=np.random.default_rng(0), random_size=True)
+    assert config['maze']['min_rows'] <= sized.num_rows <= config['maze']['max_rows']
+    assert config['maze']['min_cols'] <= sized.num_cols <= config['maze']['max_cols']
+
+
+def test_maze_pool_serves_precompiled_mazes(tmp_path):
+    filename = str(tmp_path / "mazes.pool")
+    pool = MazePool.build(filename, num_mazes=12, num_rows=4, num_cols=6, seed=0, num_workers=2)
+    assert len(pool) == 12
+    for index in range(len(pool)):
+        stored = pool.maze(index)
+        fresh = Maze(np.array(stored.walls), 4, 6)
+        assert nx.is_connected(fresh.graph)
+        assert np.array_equal(stored.transitions, fresh.transitions)
+        assert np.array_equal(stored.distance, fresh.distance)
+        assert np.array_equal(stored.next_hop, fresh.next_hop)
+
+    # Workers receive the pool by file name and map it again
+    shared = pickle.loads(pickle.dumps(pool))
+    assert np.array_equal(shared.tables['walls'], pool.tables['walls'])
+
+    env = MazeEnv(reuse_maze=False, maze_pool=filename)
+    pool_walls = {bytes(walls) for walls in pool.tables['walls']}
+    for seed in range(5):
+        env.reset(seed=seed)
+        assert bytes(env.sim.maze.walls) in pool_walls